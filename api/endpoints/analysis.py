@@ -19,6 +19,7 @@ from ..models import (
     AnalysisResponse,
     BatchAnalysisRequest,
     BatchAnalysisResponse,
+    BatchResultResponse,
     ErrorResponse,
     ModelType,
     DeviceType
@@ -30,7 +31,8 @@ from ..utils import (
     generate_unique_filename,
     cleanup_temp_files,
     ensure_directory,
-    get_audio_duration
+    get_audio_duration,
+    ModelJSONResponse
 )
 from ..utils.memory_file_handler import memory_file_handler, cleanup_expired_files
 
@@ -240,6 +242,16 @@ async def analyze_audio(
         """,
         example=False
     ),
+    inline_arrays: bool = Form(
+        default=False,
+        description="""
+        ## 内联数组数据
+
+        如果设置为True，激活数据和嵌入向量会直接包含在响应JSON中。
+        默认仅返回NPZ/NPY文件的下载链接，可用 np.load 直接读取。
+        """,
+        example=False
+    ),
     overwrite: bool = Form(
         default=False,
         description="""
@@ -292,6 +304,7 @@ async def analyze_audio(
             sonify=sonify,
             include_activations=include_activations,
             include_embeddings=include_embeddings,
+            inline_arrays=inline_arrays,
             overwrite=overwrite
         )
 
@@ -317,7 +330,7 @@ async def analyze_audio(
             model=model.value
         )
 
-        return AnalysisResponse(
+        return ModelJSONResponse(AnalysisResponse(
             success=True,
             message="分析完成",
             data=result_data,
@@ -325,7 +338,7 @@ async def analyze_audio(
             processing_time=processing_time,
             model_used=model.value,
             request_id=request_id
-        )
+        ))
 
     except HTTPException:
         raise
@@ -373,6 +386,7 @@ async def analyze_batch(
     sonify: bool = Form(default=False),
     include_activations: bool = Form(default=False),
     include_embeddings: bool = Form(default=False),
+    inline_arrays: bool = Form(default=False),
     overwrite: bool = Form(default=False),
     priority: int = Form(default=1, ge=1, le=5, description="任务优先级（1-5）")
 ) -> BatchAnalysisResponse:
@@ -403,6 +417,7 @@ async def analyze_batch(
         sonify=sonify,
         include_activations=include_activations,
         include_embeddings=include_embeddings,
+        inline_arrays=inline_arrays,
         overwrite=overwrite,
         priority=priority
     )
@@ -411,18 +426,20 @@ async def analyze_batch(
         files, batch_request, background_tasks
     )
 
-    return BatchAnalysisResponse(
+    return ModelJSONResponse(BatchAnalysisResponse(
         success=True,
         task_id=task_id,
         message=f"批量分析任务已创建，共{len(files)}个文件",
-        estimated_time=f"{len(files) * 30}-{len(files) * 60}秒",
+        estimated_seconds_min=len(files) * 30,
+        estimated_seconds_max=len(files) * 60,
         file_count=len(files),
         priority=priority
-    )
+    ))
 
 
 @router.get(
     "/analyze-batch/{task_id}",
+    response_model=BatchResultResponse,
     summary="查询批量分析任务状态",
     description="""
     查询批量分析任务的执行状态和结果。
@@ -434,7 +451,7 @@ async def analyze_batch(
     - 完整的分析结果（如果任务已完成）
     """
 )
-async def get_batch_analysis_status(task_id: str):
+async def get_batch_analysis_status(task_id: str) -> BatchResultResponse:
     """
     获取批量分析任务的状态和结果
     """
@@ -446,7 +463,7 @@ async def get_batch_analysis_status(task_id: str):
             detail=f"任务不存在: {task_id}"
         )
 
-    return result
+    return ModelJSONResponse(content=result)
 
 
 @router.delete(
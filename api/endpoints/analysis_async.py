@@ -5,7 +5,7 @@
 
 import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Dict, Any
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
@@ -23,7 +23,8 @@ from ..models import (
 from ..services.analysis_service import AnalysisService
 from ..utils import (
     validate_audio_file,
-    get_audio_duration
+    get_audio_duration,
+    ModelJSONResponse
 )
 from ..utils.memory_file_handler import memory_file_handler
 from ..services.progress_tracker import ProgressTracker, AnalysisStep
@@ -53,7 +54,8 @@ async_tasks: Dict[str, Dict[str, Any]] = {}
                         "message": "分析任务已创建",
                         "task_id": "task_20241123_001",
                         "request_id": "req_20241123_001",
-                        "estimated_time": "45-90秒",
+                        "estimated_seconds_min": 45,
+                        "estimated_seconds_max": 90,
                         "status_url": "/api/analyze/task/task_20241123_001/status"
                     }
                 }
@@ -92,7 +94,8 @@ async_tasks: Dict[str, Dict[str, Any]] = {}
       "message": "分析任务已创建",
       "task_id": "task_20241123_001",
       "request_id": "req_20241123_001",
-      "estimated_time": "45-90秒",
+      "estimated_seconds_min": 45,
+      "estimated_seconds_max": 90,
       "status_url": "/api/analyze/task/task_20241123_001/status"
     }
     ```
@@ -150,6 +153,10 @@ async def submit_analysis_task(
         default=False,
         description="是否包含嵌入向量数据"
     ),
+    inline_arrays: bool = Form(
+        default=False,
+        description="是否在响应中内联激活数据和嵌入向量（默认仅提供文件下载链接）"
+    ),
     overwrite: bool = Form(
         default=False,
         description="是否覆盖已存在的分析结果"
@@ -196,14 +203,15 @@ async def submit_analysis_task(
             sonify=sonify,
             include_activations=include_activations,
             include_embeddings=include_embeddings,
+            inline_arrays=inline_arrays,
             overwrite=overwrite
         )
 
         # 估算处理时间
         if duration:
-            estimated_time = f"{int(duration * 3)}-{int(duration * 6)}秒"
+            estimated_seconds_min, estimated_seconds_max = int(duration * 3), int(duration * 6)
         else:
-            estimated_time = "60-120秒"
+            estimated_seconds_min, estimated_seconds_max = 60, 120
 
         # 保存任务信息
         async_tasks[task_id] = {
@@ -216,9 +224,10 @@ async def submit_analysis_task(
             "progress": 0.0,
             "current_step": "queued",
             "message": "任务已创建，等待处理",
-            "created_at": datetime.utcnow().isoformat() + "Z",
-            "updated_at": datetime.utcnow().isoformat() + "Z",
-            "estimated_time": estimated_time,
+            "created_at": datetime.now(timezone.utc),
+            "updated_at": datetime.now(timezone.utc),
+            "estimated_seconds_min": estimated_seconds_min,
+            "estimated_seconds_max": estimated_seconds_max,
             "duration": duration,
             "start_time": None,
             "end_time": None
@@ -234,17 +243,19 @@ async def submit_analysis_task(
             "异步分析任务已创建",
             task_id=task_id,
             request_id=request_id,
-            estimated_time=estimated_time
+            estimated_seconds_min=estimated_seconds_min,
+            estimated_seconds_max=estimated_seconds_max
         )
 
-        return AsyncAnalysisSubmitResponse(
+        return ModelJSONResponse(AsyncAnalysisSubmitResponse(
             success=True,
             message="分析任务已创建",
             task_id=task_id,
             request_id=request_id,
-            estimated_time=estimated_time,
+            estimated_seconds_min=estimated_seconds_min,
+            estimated_seconds_max=estimated_seconds_max,
             status_url=f"/api/analyze/task/{task_id}/status"
-        )
+        ))
 
     except Exception as e:
         # 清理临时文件
@@ -275,7 +286,8 @@ async def submit_analysis_task(
                         "message": "正在进行节拍检测分析",
                         "created_at": "2024-11-23T10:30:00Z",
                         "updated_at": "2024-11-23T10:31:15Z",
-                        "estimated_remaining": "20-30秒"
+                        "estimated_seconds_min": 20,
+                        "estimated_seconds_max": 30
                     }
                 }
             }
@@ -326,16 +338,17 @@ async def get_task_status(task_id: str) -> AsyncTaskStatus:
 
     task_info = async_tasks[task_id]
 
-    # 计算预估剩余时间
-    estimated_remaining = None
-    if task_info["status"] == "processing" and task_info["progress"] > 0:
-        elapsed = time.time() - task_info.get("start_time", time.time())
-        total_estimated = elapsed / (task_info["progress"] / 100)
-        remaining = total_estimated - elapsed
-        if remaining > 0:
-            estimated_remaining = f"{int(remaining)}秒"
+    # 预估剩余时间范围：与同步进度接口一致，由进度跟踪器按当前步骤估算
+    estimated_seconds_min = None
+    estimated_seconds_max = None
+    if task_info["status"] == "processing":
+        tracker = ProgressTracker.get_tracker(task_info["request_id"])
+        if tracker is not None:
+            tracker_status = tracker.get_status()
+            estimated_seconds_min = tracker_status["estimated_seconds_min"]
+            estimated_seconds_max = tracker_status["estimated_seconds_max"]
 
-    return AsyncTaskStatus(
+    return ModelJSONResponse(AsyncTaskStatus(
         task_id=task_info["task_id"],
         request_id=task_info["request_id"],
         status=task_info["status"],
@@ -344,9 +357,10 @@ async def get_task_status(task_id: str) -> AsyncTaskStatus:
         message=task_info["message"],
         created_at=task_info["created_at"],
         updated_at=task_info["updated_at"],
-        estimated_remaining=estimated_remaining,
+        estimated_seconds_min=estimated_seconds_min,
+        estimated_seconds_max=estimated_seconds_max,
         error=task_info.get("error")
-    )
+    ))
 
 
 @router.get(
@@ -449,7 +463,7 @@ async def get_task_result(task_id: str) -> AsyncAnalysisResult:
     result_data = task_info["result"]
     processing_time = task_info.get("end_time", time.time()) - task_info.get("start_time", time.time())
 
-    return AsyncAnalysisResult(
+    return ModelJSONResponse(AsyncAnalysisResult(
         success=True,
         message="分析完成",
         data=result_data["data"],
@@ -458,7 +472,7 @@ async def get_task_result(task_id: str) -> AsyncAnalysisResult:
         model_used=task_info["request"].model.value,
         request_id=task_info["request_id"],
         task_id=task_id
-    )
+    ))
 
 
 @router.delete(
@@ -549,7 +563,7 @@ async def _process_async_analysis_task(task_id: str):
         task_info["current_step"] = "initializing"
         task_info["message"] = "开始分析处理"
         task_info["start_time"] = time.time()
-        task_info["updated_at"] = datetime.utcnow().isoformat() + "Z"
+        task_info["updated_at"] = datetime.now(timezone.utc)
 
         file_path = task_info["file_path"]
         request = task_info["request"]
@@ -568,7 +582,7 @@ async def _process_async_analysis_task(task_id: str):
         task_info["current_step"] = "completed"
         task_info["message"] = "分析完成"
         task_info["end_time"] = time.time()
-        task_info["updated_at"] = datetime.utcnow().isoformat() + "Z"
+        task_info["updated_at"] = datetime.now(timezone.utc)
         task_info["result"] = {
             "data": result_data,
             "files": file_links
@@ -587,7 +601,7 @@ async def _process_async_analysis_task(task_id: str):
         task_info["current_step"] = "failed"
         task_info["message"] = f"分析失败: {str(e)}"
         task_info["end_time"] = time.time()
-        task_info["updated_at"] = datetime.utcnow().isoformat() + "Z"
+        task_info["updated_at"] = datetime.now(timezone.utc)
         task_info["error"] = str(e)
 
         logger.error(
@@ -619,4 +633,4 @@ def _update_task_progress(task_id: str, step: AnalysisStep, progress: float, mes
         task_info["progress"] = progress
         task_info["current_step"] = step.value if hasattr(step, 'value') else str(step)
         task_info["message"] = message
-        task_info["updated_at"] = datetime.utcnow().isoformat() + "Z"
\ No newline at end of file
+        task_info["updated_at"] = datetime.now(timezone.utc)
\ No newline at end of file
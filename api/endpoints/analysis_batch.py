@@ -6,19 +6,25 @@
 import time
 import uuid
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
 import structlog
 
 from ..models import (
     BatchAnalysisRequest,
     BatchAnalysisResponse,
+    BatchStatusResponse,
+    BatchListResponse,
+    BatchTaskSummary,
+    BatchProgress,
+    BatchTiming,
+    FileSummary,
     TaskStatus,
     ErrorResponse,
     ModelType
 )
 from ..services.analysis_service import AnalysisService
-from ..utils import validate_audio_file, get_audio_duration
+from ..utils import validate_audio_file, get_file_info, probe_many, ModelJSONResponse
 from ..utils.memory_file_handler import memory_file_handler
 
 logger = structlog.get_logger()
@@ -44,7 +50,8 @@ batch_tasks: Dict[str, Dict[str, Any]] = {}
                         "success": True,
                         "task_id": "batch_20241123_001",
                         "message": "批量分析任务已创建，共5个文件",
-                        "estimated_time": "5-10分钟",
+                        "estimated_seconds_min": 300,
+                        "estimated_seconds_max": 600,
                         "file_count": 5,
                         "priority": 1,
                         "files": [
@@ -139,7 +146,8 @@ batch_tasks: Dict[str, Dict[str, Any]] = {}
       "current_file": "song3.wav",
       "completed_files": ["song1.wav", "song2.wav"],
       "failed_files": [],
-      "estimated_remaining": "2-3分钟",
+      "estimated_seconds_min": 120,
+      "estimated_seconds_max": 180,
       "file_count": 5,
       "completed_count": 2,
       "failed_count": 0
@@ -288,6 +296,10 @@ async def submit_batch_analysis(
         default=False,
         description="是否包含所有文件的嵌入向量数据"
     ),
+    inline_arrays: bool = Form(
+        default=False,
+        description="是否在结果中内联激活数据和嵌入向量（默认仅提供文件下载链接）"
+    ),
     overwrite: bool = Form(
         default=False,
         description="是否覆盖已存在的分析结果"
@@ -352,10 +364,10 @@ async def submit_batch_analysis(
                     invalid_files.append(file_info)
                     continue
 
-                # 获取文件大小信息
-                content = await file.read()
-                file_size = len(content)
-                await file.seek(0)  # 重置文件指针
+                # 获取文件大小信息（优先使用上传时记录的大小，不读取文件内容）
+                file_size = file.size
+                if file_size is None:
+                    file_size = (await get_file_info(file))["size_bytes"]
 
                 file_info["size_bytes"] = file_size
                 file_info["size_mb"] = round(file_size / (1024 * 1024), 2)
@@ -373,17 +385,12 @@ async def submit_batch_analysis(
                 invalid_files.append(file_info)
 
         # 检查是否有有效文件
-        if len(validified_files) == 0:
+        if len(validated_files) == 0:
             raise HTTPException(
                 status_code=400,
                 detail="没有有效的音频文件，请检查文件格式和大小"
             )
 
-        # 估算处理时间（假设每个文件平均处理时间）
-        avg_time_per_file = 30  # CPU平均处理时间（秒）
-        estimated_seconds = len(validated_files) * avg_time_per_file
-        estimated_time = f"{estimated_seconds//60}-{estimated_seconds//60 + 1}分钟"
-
         # 保存文件到临时目录
         temp_file_paths = []
         file_ids = []
@@ -394,16 +401,25 @@ async def submit_batch_analysis(
             # 保存文件
             upload_path, file_id = await memory_file_handler.save_to_temp(original_file)
 
-            # 获取音频时长信息（用于显示，不做限制）
-            duration = await get_audio_duration(upload_path)
-            if duration:
-                logger.info("音频时长信息", duration=duration, filename=original_file.filename)
-                file_info["duration"] = duration
-
             temp_file_paths.append(upload_path)
             file_ids.append(file_id)
             file_info["temp_path"] = str(upload_path)
             file_info["file_id"] = file_id
+
+        # 并行探测所有已保存的文件，无法解析的音频标记为无效
+        audio_infos = await probe_many(temp_file_paths)
+        for file_info, audio_info in zip(validated_files, audio_infos):
+            if not audio_info["valid"]:
+                file_info["status"] = "invalid_audio"
+                file_info["error"] = "无法读取的音频文件"
+                total_size -= file_info["size_bytes"]
+                invalid_files.append(file_info)
+                continue
+
+            # 音频时长信息（用于显示，不做限制）
+            duration = audio_info["duration"] or None
+            if duration:
+                logger.info("音频时长信息", duration=duration, filename=file_info["filename"])
             file_info["duration"] = duration
 
         # 重新计算有效文件数量
@@ -412,9 +428,15 @@ async def submit_batch_analysis(
         if len(valid_files) == 0:
             raise HTTPException(
                 status_code=400,
-                detail="没有符合要求的音频文件（时长超过限制）"
+                detail="没有可读取的音频文件，请检查文件内容"
             )
 
+        # 估算处理时间（假设每个文件平均处理时间）
+        avg_time_per_file = 30  # CPU平均处理时间（秒）
+        estimated_seconds = len(valid_files) * avg_time_per_file
+        estimated_seconds_min = (estimated_seconds // 60) * 60
+        estimated_seconds_max = (estimated_seconds // 60 + 1) * 60
+
         # 创建批量任务记录
         batch_tasks[task_id] = {
             "task_id": task_id,
@@ -433,6 +455,7 @@ async def submit_batch_analysis(
                 "sonify": sonify,
                 "include_activations": include_activations,
                 "include_embeddings": include_embeddings,
+                "inline_arrays": inline_arrays,
                 "overwrite": overwrite,
                 "continue_on_error": continue_on_error
             },
@@ -445,12 +468,13 @@ async def submit_batch_analysis(
                 "failed_count": 0
             },
             "timing": {
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
+                "created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc),
                 "started_at": None,
                 "completed_at": None
             },
-            "estimated_time": estimated_time
+            "estimated_seconds_min": estimated_seconds_min,
+            "estimated_seconds_max": estimated_seconds_max
         }
 
         # 添加后台任务
@@ -465,17 +489,19 @@ async def submit_batch_analysis(
             valid_files=len(valid_files),
             invalid_files=len(invalid_files),
             total_size_mb=batch_tasks[task_id]["total_size_mb"],
-            estimated_time=estimated_time
+            estimated_seconds_min=estimated_seconds_min,
+            estimated_seconds_max=estimated_seconds_max
         )
 
-        return BatchAnalysisResponse(
+        return ModelJSONResponse(BatchAnalysisResponse(
             success=True,
             task_id=task_id,
             message=f"批量分析任务已创建，共{len(valid_files)}个文件",
-            estimated_time=estimated_time,
+            estimated_seconds_min=estimated_seconds_min,
+            estimated_seconds_max=estimated_seconds_max,
             file_count=len(valid_files),
             priority=priority
-        )
+        ))
 
     except Exception as e:
         # 清理已保存的临时文件
@@ -508,7 +534,7 @@ async def _process_batch_analysis_task(task_id: str):
     try:
         # 更新任务状态为处理中
         task["status"] = "processing"
-        timing["started_at"] = datetime.now().isoformat()
+        timing["started_at"] = datetime.now(timezone.utc)
         timing["updated_at"] = timing["started_at"]
 
         valid_files = task["valid_files"]
@@ -529,7 +555,7 @@ async def _process_batch_analysis_task(task_id: str):
                 progress["failed_count"] = len(progress["failed_files"])
                 overall_progress = (i / total_files) * 100
                 task["progress"] = {**progress, "overall_progress": overall_progress}
-                timing["updated_at"] = datetime.now().isoformat()
+                timing["updated_at"] = datetime.now(timezone.utc)
 
                 logger.info(
                     "处理批量任务文件",
@@ -549,6 +575,7 @@ async def _process_batch_analysis_task(task_id: str):
                     sonify=request_params["sonify"],
                     include_activations=request_params["include_activations"],
                     include_embeddings=request_params["include_embeddings"],
+                    inline_arrays=request_params["inline_arrays"],
                     overwrite=request_params["overwrite"]
                 )
 
@@ -592,7 +619,7 @@ async def _process_batch_analysis_task(task_id: str):
 
         # 任务完成
         task["status"] = "completed"
-        timing["completed_at"] = datetime.now().isoformat()
+        timing["completed_at"] = datetime.now(timezone.utc)
         timing["updated_at"] = timing["completed_at"]
         progress["current_file"] = None
         progress["overall_progress"] = 100.0
@@ -604,8 +631,7 @@ async def _process_batch_analysis_task(task_id: str):
             completed_count=len(progress["completed_files"]),
             failed_count=len(progress["failed_files"]),
             total_processing_time=(
-                datetime.fromisoformat(timing["completed_at"]) -
-                datetime.fromisoformat(timing["started_at"])
+                timing["completed_at"] - timing["started_at"]
             ).total_seconds()
         )
 
@@ -616,7 +642,7 @@ async def _process_batch_analysis_task(task_id: str):
             error=str(e)
         )
         task["status"] = "failed"
-        timing["updated_at"] = datetime.now().isoformat()
+        timing["updated_at"] = datetime.now(timezone.utc)
 
     finally:
         # 清理所有临时文件
@@ -625,6 +651,7 @@ async def _process_batch_analysis_task(task_id: str):
 
 @router.get(
     "/analyze/batch/{task_id}/status",
+    response_model=BatchStatusResponse,
     summary="查询批量分析任务状态",
     description="""
     查询批量分析任务的执行状态和详细进度信息。
@@ -636,7 +663,7 @@ async def _process_batch_analysis_task(task_id: str):
     - 时间统计信息
     """
 )
-async def get_batch_analysis_status(task_id: str):
+async def get_batch_analysis_status(task_id: str) -> BatchStatusResponse:
     """
     获取批量分析任务状态
 
@@ -644,7 +671,7 @@ async def get_batch_analysis_status(task_id: str):
         task_id: 任务ID
 
     Returns:
-        Dict: 任务状态和进度信息
+        BatchStatusResponse: 任务状态和进度信息
     """
     if task_id not in batch_tasks:
         raise HTTPException(
@@ -657,46 +684,48 @@ async def get_batch_analysis_status(task_id: str):
     timing = task["timing"]
 
     # 计算预计剩余时间
-    estimated_remaining = None
+    estimated_remaining_min = None
+    estimated_remaining_max = None
     if task["status"] == "processing" and progress["completed_count"] > 0:
-        elapsed_time = (
-            datetime.now() -
-            datetime.fromisoformat(timing["started_at"])
-        ).total_seconds()
+        elapsed_time = (datetime.now(timezone.utc) - timing["started_at"]).total_seconds()
 
         avg_time_per_file = elapsed_time / progress["completed_count"]
         remaining_files = task["file_count"] - progress["completed_count"]
         estimated_seconds = remaining_files * avg_time_per_file
 
         if estimated_seconds > 0:
-            estimated_remaining = f"{int(estimated_seconds // 60)}-{int((estimated_seconds // 60) + 1)}分钟"
-
-    return {
-        "task_id": task_id,
-        "status": task["status"],
-        "priority": task["priority"],
-        "progress": {
-            "overall_progress": progress.get("overall_progress", 0),
-            "current_file": progress["current_file"],
-            "completed_files": progress["completed_files"],
-            "failed_files": progress["failed_files"],
-            "file_count": task["file_count"],
-            "completed_count": progress["completed_count"],
-            "failed_count": progress["failed_count"],
-            "estimated_remaining": estimated_remaining
-        },
-        "timing": {
-            "created_at": timing["created_at"],
-            "started_at": timing.get("started_at"),
-            "updated_at": timing["updated_at"],
-            "estimated_time": task["estimated_time"]
-        },
-        "file_summary": {
-            "valid_files": len(task["valid_files"]),
-            "invalid_files": len(task["invalid_files"]),
-            "total_size_mb": task["total_size_mb"]
-        }
-    }
+            estimated_minutes = int(estimated_seconds // 60)
+            estimated_remaining_min = estimated_minutes * 60
+            estimated_remaining_max = (estimated_minutes + 1) * 60
+
+    return ModelJSONResponse(BatchStatusResponse(
+        task_id=task_id,
+        status=task["status"],
+        priority=task["priority"],
+        progress=BatchProgress(
+            overall_progress=progress.get("overall_progress", 0),
+            current_file=progress["current_file"],
+            completed_files=progress["completed_files"],
+            failed_files=progress["failed_files"],
+            file_count=task["file_count"],
+            completed_count=progress["completed_count"],
+            failed_count=progress["failed_count"],
+            estimated_seconds_min=estimated_remaining_min,
+            estimated_seconds_max=estimated_remaining_max
+        ),
+        timing=BatchTiming(
+            created_at=timing["created_at"],
+            started_at=timing.get("started_at"),
+            updated_at=timing["updated_at"],
+            estimated_seconds_min=task["estimated_seconds_min"],
+            estimated_seconds_max=task["estimated_seconds_max"]
+        ),
+        file_summary=FileSummary(
+            valid_files=len(task["valid_files"]),
+            invalid_files=len(task["invalid_files"]),
+            total_size_mb=task["total_size_mb"]
+        )
+    ))
 
 @router.get(
     "/analyze/batch/{task_id}/result",
@@ -756,8 +785,7 @@ async def get_batch_analysis_result(task_id: str):
         response["results"] = results
         response["files"] = files
         response["total_processing_time"] = (
-            datetime.fromisoformat(timing["completed_at"]) -
-            datetime.fromisoformat(timing["started_at"])
+            timing["completed_at"] - timing["started_at"]
         ).total_seconds() if timing.get("started_at") else None
 
     elif task["status"] == "failed":
@@ -799,7 +827,7 @@ async def cancel_or_delete_batch_task(task_id: str):
     if task["status"] in ["pending", "processing"]:
         # 取消正在处理的任务
         task["status"] = "cancelled"
-        task["timing"]["updated_at"] = datetime.now().isoformat()
+        task["timing"]["updated_at"] = datetime.now(timezone.utc)
 
         logger.info("批量任务已取消", task_id=task_id)
         return {
@@ -823,6 +851,7 @@ async def cancel_or_delete_batch_task(task_id: str):
 
 @router.get(
     "/analyze/batch/list",
+    response_model=BatchListResponse,
     summary="获取批量任务列表",
     description="""
     获取所有批量任务的简要信息列表。
@@ -846,7 +875,7 @@ async def list_batch_tasks(
         limit: 返回结果数量限制
 
     Returns:
-        Dict: 任务列表
+        BatchListResponse: 任务列表
     """
     try:
         tasks = []
@@ -856,30 +885,31 @@ async def list_batch_tasks(
             if status and task_data["status"] != status:
                 continue
 
-            tasks.append({
-                "task_id": task_id,
-                "status": task_data["status"],
-                "priority": task_data["priority"],
-                "file_count": task_data["file_count"],
-                "completed_count": len(task_data["progress"]["completed_files"]),
-                "failed_count": len(task_data["progress"]["failed_files"]),
-                "total_size_mb": task_data["total_size_mb"],
-                "created_at": task_data["timing"]["created_at"],
-                "updated_at": task_data["timing"]["updated_at"],
-                "estimated_time": task_data.get("estimated_time")
-            })
+            tasks.append(BatchTaskSummary(
+                task_id=task_id,
+                status=task_data["status"],
+                priority=task_data["priority"],
+                file_count=task_data["file_count"],
+                completed_count=len(task_data["progress"]["completed_files"]),
+                failed_count=len(task_data["progress"]["failed_files"]),
+                total_size_mb=task_data["total_size_mb"],
+                created_at=task_data["timing"]["created_at"],
+                updated_at=task_data["timing"]["updated_at"],
+                estimated_seconds_min=task_data.get("estimated_seconds_min"),
+                estimated_seconds_max=task_data.get("estimated_seconds_max")
+            ))
 
         # 按创建时间倒序排列
-        tasks.sort(key=lambda x: x["created_at"], reverse=True)
+        tasks.sort(key=lambda x: x.created_at, reverse=True)
 
         # 限制结果数量
         tasks = tasks[:limit]
 
-        return {
-            "success": True,
-            "total_count": len(tasks),
-            "tasks": tasks
-        }
+        return ModelJSONResponse(BatchListResponse(
+            success=True,
+            total_count=len(tasks),
+            tasks=tasks
+        ))
 
     except Exception as e:
         logger.error("获取批量任务列表失败", error=str(e))
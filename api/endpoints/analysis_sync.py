@@ -20,7 +20,8 @@ from ..models import (
 from ..services.analysis_service import AnalysisService
 from ..utils import (
     validate_audio_file,
-    get_audio_duration
+    get_audio_duration,
+    ModelJSONResponse
 )
 from ..utils.memory_file_handler import memory_file_handler
 
@@ -212,6 +213,10 @@ async def analyze_audio_sync(
         default=False,
         description="是否包含嵌入向量数据"
     ),
+    inline_arrays: bool = Form(
+        default=False,
+        description="是否在响应中内联激活数据和嵌入向量（默认仅提供文件下载链接）"
+    ),
     overwrite: bool = Form(
         default=False,
         description="是否覆盖已存在的分析结果"
@@ -269,6 +274,7 @@ async def analyze_audio_sync(
             sonify=sonify,
             include_activations=include_activations,
             include_embeddings=include_embeddings,
+            inline_arrays=inline_arrays,
             overwrite=overwrite
         )
 
@@ -303,7 +309,7 @@ async def analyze_audio_sync(
             duration=duration
         )
 
-        return AnalysisResponse(
+        return ModelJSONResponse(AnalysisResponse(
             success=True,
             message="分析完成",
             data=result_data,
@@ -311,7 +317,7 @@ async def analyze_audio_sync(
             processing_time=processing_time,
             model_used=model.value,
             request_id=request_id
-        )
+        ))
 
     except HTTPException:
         # 确保异常情况下也清理临时文件
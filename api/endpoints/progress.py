@@ -50,7 +50,7 @@ router = APIRouter()
 
         console.log(`当前步骤: ${data.step_description}`);
         console.log(`总体进度: ${data.overall_progress}%`);
-        console.log(`预计剩余: ${data.estimated_remaining}`);
+        console.log(`预计剩余: ${data.estimated_seconds_min}-${data.estimated_seconds_max}秒`);
 
         if (data.overall_progress < 100) {
             setTimeout(() => pollProgress(requestId), 1000);
@@ -70,7 +70,8 @@ router = APIRouter()
                         "step_progress": 65.0,
                         "overall_progress": 68.5,
                         "elapsed_time": 45.2,
-                        "estimated_remaining": "1分30秒",
+                        "estimated_seconds_min": 60,
+                        "estimated_seconds_max": 120,
                         "step_start_time": 1699123456.789
                     }
                 }
@@ -176,7 +177,8 @@ async def get_progress_summary(include_details: bool = False) -> Dict[str, Any]:
                     "step_description": data["step_description"],
                     "overall_progress": data["overall_progress"],
                     "elapsed_time": data["elapsed_time"],
-                    "estimated_remaining": data.get("estimated_remaining")
+                    "estimated_seconds_min": data.get("estimated_seconds_min"),
+                    "estimated_seconds_max": data.get("estimated_seconds_max")
                 }
                 for request_id, data in all_progress.items()
             ]
@@ -3,7 +3,6 @@
 提供临时文件使用情况的监控和管理
 """
 
-import os
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException
 import structlog
@@ -38,10 +37,10 @@ async def get_temp_files_status() -> Dict[str, Any]:
         avg_size = total_size / file_count if file_count > 0 else 0
         max_size = 0
 
-        for file_info in memory_file_handler.temp_files.values():
+        for file_path in memory_file_handler.paths.values():
             try:
-                if file_info["path"].exists():
-                    file_size = file_info["path"].stat().st_size
+                if file_path.exists():
+                    file_size = file_path.stat().st_size
                     max_size = max(max_size, file_size)
             except Exception:
                 continue
@@ -54,7 +53,7 @@ async def get_temp_files_status() -> Dict[str, Any]:
             "average_size_mb": round(avg_size / (1024 * 1024), 2),
             "max_size_bytes": max_size,
             "max_size_mb": round(max_size / (1024 * 1024), 2),
-            "temp_directory": os.path.join(os.getcwd(), "tmp", "music_analysis")
+            "temp_directory": str(memory_file_handler.root)
         }
 
     except Exception as e:
@@ -14,7 +14,6 @@ from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
 import structlog
 
 from .endpoints import (
@@ -27,6 +26,8 @@ from .endpoints import (
     storage_monitor      # 存储监控API
 )
 from .models import ErrorResponse
+from .utils import ModelJSONResponse
+from .services.analysis_worker import shutdown_executor
 
 # 配置日志
 structlog.configure(
@@ -323,6 +324,9 @@ async def shutdown_event():
     """应用关闭事件"""
     logger.info("音乐分析API关闭", uptime=time.time() - START_TIME)
 
+    # 关闭常驻分析进程
+    shutdown_executor()
+
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
     """添加处理时间和请求头信息"""
@@ -370,9 +374,9 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         request_id=request_id
     )
 
-    return JSONResponse(
+    return ModelJSONResponse(
         status_code=exc.status_code,
-        content=error_response.dict()
+        content=error_response
     )
 
 @app.exception_handler(Exception)
@@ -394,9 +398,9 @@ async def general_exception_handler(request: Request, exc: Exception):
         request_id=request_id
     )
 
-    return JSONResponse(
+    return ModelJSONResponse(
         status_code=500,
-        content=error_response.dict()
+        content=error_response
     )
 
 @app.get("/", include_in_schema=False)
@@ -5,6 +5,7 @@ API数据模型定义
 
 from .request_models import AnalysisRequest, BatchAnalysisRequest
 from .response_models import (
+    Activations,
     AnalysisResult,
     AnalysisResponse,
     BatchAnalysisResponse,
@@ -23,17 +24,22 @@ from .response_models import (
     BatchTaskSummary,
     BatchStatusResponse,
     BatchListResponse,
+    FileSummary,
     ProgressStatus,
     ProgressSummary,
+    ActiveTaskInfo,
     SystemInfo,
+    ModelInfo,
+    FormatInfo,
     # 异步分析结果相关模型
-    AsyncAnalysisData,
     AsyncAnalysisFile,
     AsyncAnalysisFiles,
     AsyncAnalysisResultSuccess,
     AsyncAnalysisResultPending,
     AsyncAnalysisResultProcessing,
-    AsyncAnalysisResultFailed
+    AsyncAnalysisResultFailed,
+    # 响应序列化器
+    get_response_adapter
 )
 from .data_models import Segment, SegmentLabel, ModelType, DeviceType
 
@@ -43,6 +49,7 @@ __all__ = [
     "BatchAnalysisRequest",
 
     # Response models
+    "Activations",
     "AnalysisResult",
     "AnalysisResponse",
     "BatchAnalysisResponse",
@@ -62,12 +69,15 @@ __all__ = [
     "BatchTaskSummary",
     "BatchStatusResponse",
     "BatchListResponse",
+    "FileSummary",
     "ProgressStatus",
     "ProgressSummary",
+    "ActiveTaskInfo",
     "SystemInfo",
+    "ModelInfo",
+    "FormatInfo",
 
     # 异步分析结果相关模型
-    "AsyncAnalysisData",
     "AsyncAnalysisFile",
     "AsyncAnalysisFiles",
     "AsyncAnalysisResultSuccess",
@@ -75,6 +85,9 @@ __all__ = [
     "AsyncAnalysisResultProcessing",
     "AsyncAnalysisResultFailed",
 
+    # 响应序列化器
+    "get_response_adapter",
+
     # Data models
     "Segment",
     "SegmentLabel",
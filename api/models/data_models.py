@@ -3,8 +3,10 @@
 定义音频分析相关的数据结构和枚举类型
 """
 
-from pydantic import BaseModel, Field
+from pydantic import ConfigDict, Field
+from pydantic.dataclasses import dataclass
 from typing import List
+from typing_extensions import Annotated
 from enum import Enum
 
 
@@ -56,33 +58,56 @@ class SegmentLabel(str, Enum):
     SOLO = "solo"
 
 
-class Segment(BaseModel):
-    """音频段落信息"""
-    start: float = Field(description="段落开始时间（秒）", example=13.13, ge=0.0)
-    end: float = Field(description="段落结束时间（秒）", example=37.53, gt=0)
-    label: SegmentLabel = Field(description="段落类型标签", example=SegmentLabel.CHORUS)
+@dataclass(
+    frozen=True,
+    config=ConfigDict(
+        json_schema_extra={
+            "example": {
+                "start": 13.13,
+                "end": 37.53,
+                "label": "chorus"
+            }
+        }
+    )
+)
+class Segment:
+    """音频段落信息
+
+    每个分析结果包含大量段落，使用__slots__避免为每个实例分配__dict__
+    """
+    __slots__ = ("start", "end", "label")
+
+    start: Annotated[float, Field(description="段落开始时间（秒）", example=13.13, ge=0.0)]
+    end: Annotated[float, Field(description="段落结束时间（秒）", example=37.53, gt=0)]
+    label: Annotated[SegmentLabel, Field(description="段落类型标签", example=SegmentLabel.CHORUS)]
 
     @property
     def duration(self) -> float:
         """计算段落时长"""
         return self.end - self.start
 
-    class Config:
-        schema_extra = {
+
+@dataclass(
+    frozen=True,
+    config=ConfigDict(
+        json_schema_extra={
             "example": {
-                "start": 13.13,
-                "end": 37.53,
-                "label": "chorus"
+                "bpm": 120.0,
+                "beats": [0.33, 0.75, 1.14, 1.56, 1.98],
+                "downbeats": [0.33, 1.94, 3.53],
+                "beat_positions": [1, 2, 3, 4, 1, 2, 3, 4]
             }
         }
-
-
-class BeatInfo(BaseModel):
+    )
+)
+class BeatInfo:
     """节拍信息"""
-    bpm: float = Field(description="每分钟节拍数", example=120.0, gt=0)
-    beats: List[float] = Field(description="节拍时间点列表（秒）", example=[0.33, 0.75, 1.14, 1.56, 1.98])
-    downbeats: List[float] = Field(description="强拍时间点列表（秒）", example=[0.33, 1.94, 3.53])
-    beat_positions: List[int] = Field(description="节拍位置列表（1=第一拍，2=第二拍等）", example=[1, 2, 3, 4, 1, 2, 3, 4])
+    __slots__ = ("bpm", "beats", "downbeats", "beat_positions")
+
+    bpm: Annotated[float, Field(description="每分钟节拍数", example=120.0, gt=0)]
+    beats: Annotated[List[float], Field(description="节拍时间点列表（秒）", example=[0.33, 0.75, 1.14, 1.56, 1.98])]
+    downbeats: Annotated[List[float], Field(description="强拍时间点列表（秒）", example=[0.33, 1.94, 3.53])]
+    beat_positions: Annotated[List[int], Field(description="节拍位置列表（1=第一拍，2=第二拍等）", example=[1, 2, 3, 4, 1, 2, 3, 4])]
 
     @property
     def beat_count(self) -> int:
@@ -93,13 +118,3 @@ class BeatInfo(BaseModel):
     def downbeat_count(self) -> int:
         """强拍总数"""
         return len(self.downbeats)
-
-    class Config:
-        schema_extra = {
-            "example": {
-                "bpm": 120.0,
-                "beats": [0.33, 0.75, 1.14, 1.56, 1.98],
-                "downbeats": [0.33, 1.94, 3.53],
-                "beat_positions": [1, 2, 3, 4, 1, 2, 3, 4]
-            }
-        }
\ No newline at end of file
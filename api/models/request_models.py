@@ -36,6 +36,12 @@ class AnalysisRequest(BaseModel):
         example=False
     )
 
+    inline_arrays: bool = Field(
+        default=False,
+        description="是否在响应中内联激活数据和嵌入向量（默认仅提供.npz/.npy文件下载链接）",
+        example=False
+    )
+
     visualize: bool = Field(
         default=False,
         description="是否生成可视化图表",
@@ -66,6 +72,7 @@ class AnalysisRequest(BaseModel):
                 "model": "harmonix-all",
                                 "include_activations": False,
                 "include_embeddings": False,
+                "inline_arrays": False,
                 "visualize": True,
                 "sonify": False,
                 "overwrite": False,
@@ -102,6 +109,12 @@ class BatchAnalysisRequest(BaseModel):
         example=False
     )
 
+    inline_arrays: bool = Field(
+        default=False,
+        description="是否在响应中内联激活数据和嵌入向量（默认仅提供.npz/.npy文件下载链接）",
+        example=False
+    )
+
     visualize: bool = Field(
         default=True,
         description="是否生成可视化图表",
@@ -140,6 +153,7 @@ class BatchAnalysisRequest(BaseModel):
                 "model": "harmonix-all",
                                 "include_activations": False,
                 "include_embeddings": False,
+                "inline_arrays": False,
                 "visualize": True,
                 "sonify": False,
                 "overwrite": False,
@@ -3,20 +3,50 @@
 定义API响应的数据结构
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any, Literal
+from datetime import datetime
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing import Optional, List, Dict, Literal, Type, Union
 from .data_models import Segment, BeatInfo
 
+# 响应模型由服务端构建后只读序列化：冻结实例，忽略多余字段，不做赋值校验
+# 所有字段均未声明别名，固定使用字段名进行校验和序列化
+_RESP_CONFIG = ConfigDict(
+    extra="ignore",
+    frozen=True,
+    validate_assignment=False,
+    str_strip_whitespace=False,
+    defer_build=True,
+    populate_by_name=False,
+    serialize_by_alias=False
+)
+
+
+class Activations(BaseModel):
+    """原始激活数据"""
+    model_config = _RESP_CONFIG
+
+    beat: List[float] = Field(default=[], description="节拍激活概率", example=[0.1, 0.8, 0.9, 0.7])
+    downbeat: List[float] = Field(default=[], description="强拍激活概率", example=[0.9, 0.2, 0.1, 0.8])
+    segment: List[float] = Field(default=[], description="段落边界激活概率", example=[0.1, 0.3, 0.9, 0.2])
+    label: List[List[float]] = Field(
+        default=[],
+        description="段落标签概率分布（标签数 × 帧数）",
+        example=[[0.1, 0.8, 0.1, 0.2], [0.3, 0.7, 0.9, 0.1]]
+    )
+
 
 class AnalysisResult(BaseModel):
     """分析结果"""
+    model_config = _RESP_CONFIG
+
     path: str = Field(description="音频文件路径", example="/tmp/uploads/song.wav")
     bpm: float = Field(description="每分钟节拍数", example=120.0, gt=0)
     beats: List[float] = Field(description="节拍时间点列表（秒）", example=[0.33, 0.75, 1.14, 1.56])
     downbeats: List[float] = Field(description="强拍时间点列表（秒）", example=[0.33, 1.94, 3.53])
     beat_positions: List[int] = Field(description="节拍位置列表（1=第一拍，2=第二拍等）", example=[1, 2, 3, 4, 1, 2, 3, 4])
     segments: List[Segment] = Field(description="音频段落列表")
-    activations: Optional[Dict[str, Any]] = Field(
+    activations: Optional[Activations] = Field(
         default=None,
         description="原始激活数据（如果请求包含）",
         example={
@@ -26,10 +56,16 @@ class AnalysisResult(BaseModel):
             "label": [[0.1, 0.8, 0.1, 0.2], [0.3, 0.7, 0.9, 0.1]]
         }
     )
-    embeddings: Optional[List[float]] = Field(
+    embeddings_b64: Optional[str] = Field(
+        default=None,
+        description="嵌入向量数据（如果请求包含），float32原始字节的base64编码，"
+                    "可用 np.frombuffer(base64.b64decode(...), dtype=np.float32).reshape(embeddings_shape) 还原",
+        example="zczMPc3MTD6amZk+zczMPgAAAD8="
+    )
+    embeddings_shape: Optional[List[int]] = Field(
         default=None,
-        description="嵌入向量数据（如果请求包含）",
-        example=[0.1, 0.2, 0.3, 0.4, 0.5]
+        description="嵌入向量数组形状",
+        example=[5]
     )
 
     @property
@@ -52,6 +88,8 @@ class AnalysisResult(BaseModel):
 
 class FileLinks(BaseModel):
     """生成的文件下载链接"""
+    model_config = _RESP_CONFIG
+
     visualization: Optional[str] = Field(
         default=None,
         description="可视化图表下载链接",
@@ -81,6 +119,8 @@ class FileLinks(BaseModel):
 
 class AnalysisResponse(BaseModel):
     """分析API响应"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(description="请求是否成功", example=True)
     message: str = Field(description="响应消息", example="分析完成")
     data: AnalysisResult = Field(description="分析结果数据")
@@ -99,34 +139,46 @@ class AnalysisResponse(BaseModel):
 
 class BatchAnalysisResponse(BaseModel):
     """批量分析响应"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(description="批量任务创建成功", example=True)
     task_id: str = Field(
         description="任务ID，用于查询结果",
         example="batch_analysis_20241123_001"
     )
     message: str = Field(description="响应消息", example="批量分析任务已创建，共3个文件")
-    estimated_time: Optional[str] = Field(
+    estimated_seconds_min: Optional[int] = Field(
+        default=None,
+        description="预计完成时间下限（秒）",
+        example=45
+    )
+    estimated_seconds_max: Optional[int] = Field(
         default=None,
-        description="预计完成时间",
-        example="45-60秒"
+        description="预计完成时间上限（秒）",
+        example=60
     )
     file_count: int = Field(description="文件数量", example=3)
     priority: int = Field(description="任务优先级", example=1)
 
 
-class TaskStatus(BaseModel):
-    """任务状态"""
-    task_id: str = Field(description="任务ID", example="batch_analysis_20241123_001")
-    status: Literal["pending", "processing", "completed", "failed", "cancelled"] = Field(
-        description="任务状态",
-        example="processing"
+class _ProgressBase(BaseModel):
+    """进度信息公共字段"""
+    model_config = _RESP_CONFIG
+
+    estimated_seconds_min: Optional[int] = Field(
+        default=None,
+        description="预计剩余时间下限（秒）",
+        example=20
     )
-    progress: float = Field(
-        description="完成进度（0-100）",
-        example=45.5,
-        ge=0,
-        le=100
+    estimated_seconds_max: Optional[int] = Field(
+        default=None,
+        description="预计剩余时间上限（秒）",
+        example=30
     )
+
+
+class _FileProgressBase(_ProgressBase):
+    """按文件统计的进度信息公共字段"""
     current_file: Optional[str] = Field(
         default=None,
         description="当前处理的文件",
@@ -142,17 +194,29 @@ class TaskStatus(BaseModel):
         description="失败的文件列表",
         example=[]
     )
-    estimated_remaining: Optional[str] = Field(
-        default=None,
-        description="预计剩余时间",
-        example="20-30秒"
+
+
+class TaskStatus(_FileProgressBase):
+    """任务状态"""
+    task_id: str = Field(description="任务ID", example="batch_analysis_20241123_001")
+    status: Literal["pending", "processing", "completed", "failed", "cancelled"] = Field(
+        description="任务状态",
+        example="processing"
+    )
+    progress: float = Field(
+        description="完成进度（0-100）",
+        example=45.5,
+        ge=0,
+        le=100
     )
-    created_at: str = Field(description="任务创建时间", example="2024-11-23T10:30:00Z")
-    updated_at: str = Field(description="任务更新时间", example="2024-11-23T10:31:15Z")
+    created_at: datetime = Field(description="任务创建时间", example="2024-11-23T10:30:00Z")
+    updated_at: datetime = Field(description="任务更新时间", example="2024-11-23T10:31:15Z")
 
 
 class BatchResultResponse(BaseModel):
     """批量分析结果响应"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(description="任务完成状态", example=True)
     task_id: str = Field(description="任务ID", example="batch_analysis_20241123_001")
     status: TaskStatus = Field(description="任务状态详情")
@@ -177,6 +241,8 @@ class BatchResultResponse(BaseModel):
 
 class HealthResponse(BaseModel):
     """健康检查响应"""
+    model_config = _RESP_CONFIG
+
     status: str = Field(description="服务状态", example="healthy")
     version: str = Field(description="API版本", example="1.0.0")
     uptime: str = Field(description="服务运行时间", example="2h 30m 15s")
@@ -192,23 +258,32 @@ class HealthResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
     """错误响应格式"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(default=False, description="请求失败")
     message: str = Field(description="错误描述")
     error_code: str = Field(description="错误代码")
-    details: Optional[Dict[str, Any]] = Field(None, description="错误详情")
+    details: Optional[Dict[str, Union[str, int, float, bool]]] = Field(None, description="错误详情")
     request_id: Optional[str] = Field(None, description="请求ID")
 
 
 class AsyncAnalysisSubmitResponse(BaseModel):
     """异步分析任务提交响应"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(description="任务提交是否成功", example=True)
     message: str = Field(description="响应消息", example="分析任务已创建")
     task_id: str = Field(description="任务ID，用于查询结果", example="task_20241123_001")
     request_id: str = Field(description="请求ID，用于进度跟踪", example="req_20241123_001")
-    estimated_time: Optional[str] = Field(
+    estimated_seconds_min: Optional[int] = Field(
+        default=None,
+        description="预估处理时间下限（秒）",
+        example=45
+    )
+    estimated_seconds_max: Optional[int] = Field(
         default=None,
-        description="预估处理时间",
-        example="45-90秒"
+        description="预估处理时间上限（秒）",
+        example=90
     )
     status_url: str = Field(
         description="任务状态查询URL",
@@ -218,6 +293,8 @@ class AsyncAnalysisSubmitResponse(BaseModel):
 
 class AsyncTaskStatus(BaseModel):
     """异步任务状态"""
+    model_config = _RESP_CONFIG
+
     task_id: str = Field(description="任务ID", example="task_20241123_001")
     request_id: str = Field(description="请求ID", example="req_20241123_001")
     status: Literal["pending", "processing", "completed", "failed"] = Field(
@@ -238,18 +315,25 @@ class AsyncTaskStatus(BaseModel):
         description="状态消息",
         example="正在分析音频文件"
     )
-    created_at: str = Field(description="创建时间", example="2024-11-23T10:30:00Z")
-    updated_at: str = Field(description="更新时间", example="2024-11-23T10:31:15Z")
-    estimated_remaining: Optional[str] = Field(
+    created_at: datetime = Field(description="创建时间", example="2024-11-23T10:30:00Z")
+    updated_at: datetime = Field(description="更新时间", example="2024-11-23T10:31:15Z")
+    estimated_seconds_min: Optional[int] = Field(
+        default=None,
+        description="预计剩余时间下限（秒）",
+        example=20
+    )
+    estimated_seconds_max: Optional[int] = Field(
         default=None,
-        description="预计剩余时间",
-        example="20-30秒"
+        description="预计剩余时间上限（秒）",
+        example=30
     )
     error: Optional[str] = Field(default=None, description="错误信息")
 
 
 class AsyncAnalysisResult(BaseModel):
     """异步分析结果响应 - 与同步分析格式完全一致"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(description="请求是否成功", example=True)
     message: str = Field(description="响应消息", example="分析完成")
     data: AnalysisResult = Field(description="分析结果数据")
@@ -269,6 +353,8 @@ class AsyncAnalysisResult(BaseModel):
 
 class BatchFileInfo(BaseModel):
     """批量任务文件信息"""
+    model_config = _RESP_CONFIG
+
     filename: str = Field(description="文件名", example="song1.wav")
     size_bytes: Optional[int] = Field(default=None, description="文件大小（字节）")
     size_mb: Optional[float] = Field(default=None, description="文件大小（MB）", example=15.2)
@@ -279,29 +365,30 @@ class BatchFileInfo(BaseModel):
     duration: Optional[float] = Field(default=None, description="音频时长（秒）")
 
 
-class BatchProgress(BaseModel):
+class BatchProgress(_FileProgressBase):
     """批量任务进度信息"""
     overall_progress: Optional[float] = Field(default=None, description="总体进度（0-100）")
-    current_file: Optional[str] = Field(default=None, description="当前处理的文件")
-    completed_files: List[str] = Field(default=[], description="已完成的文件列表")
-    failed_files: List[str] = Field(default=[], description="失败的文件列表")
     file_count: Optional[int] = Field(default=None, description="总文件数")
     completed_count: Optional[int] = Field(default=None, description="已完成文件数")
     failed_count: Optional[int] = Field(default=None, description="失败文件数")
-    estimated_remaining: Optional[str] = Field(default=None, description="预计剩余时间")
 
 
 class BatchTiming(BaseModel):
     """批量任务时间信息"""
-    created_at: str = Field(description="任务创建时间", example="2024-11-23T10:30:00Z")
-    started_at: Optional[str] = Field(default=None, description="任务开始时间")
-    updated_at: str = Field(description="任务更新时间", example="2024-11-23T10:31:15Z")
-    completed_at: Optional[str] = Field(default=None, description="任务完成时间")
-    estimated_time: Optional[str] = Field(default=None, description="预估处理时间")
+    model_config = _RESP_CONFIG
+
+    created_at: datetime = Field(description="任务创建时间", example="2024-11-23T10:30:00Z")
+    started_at: Optional[datetime] = Field(default=None, description="任务开始时间")
+    updated_at: datetime = Field(description="任务更新时间", example="2024-11-23T10:31:15Z")
+    completed_at: Optional[datetime] = Field(default=None, description="任务完成时间")
+    estimated_seconds_min: Optional[int] = Field(default=None, description="预估处理时间下限（秒）")
+    estimated_seconds_max: Optional[int] = Field(default=None, description="预估处理时间上限（秒）")
 
 
 class BatchTaskSummary(BaseModel):
     """批量任务摘要"""
+    model_config = _RESP_CONFIG
+
     task_id: str = Field(description="任务ID")
     status: str = Field(description="任务状态")
     priority: int = Field(description="任务优先级")
@@ -309,29 +396,43 @@ class BatchTaskSummary(BaseModel):
     completed_count: int = Field(description="已完成数量")
     failed_count: int = Field(description="失败数量")
     total_size_mb: float = Field(description="总文件大小（MB）")
-    created_at: str = Field(description="创建时间")
-    updated_at: str = Field(description="更新时间")
-    estimated_time: Optional[str] = Field(default=None, description="预估时间")
+    created_at: datetime = Field(description="创建时间")
+    updated_at: datetime = Field(description="更新时间")
+    estimated_seconds_min: Optional[int] = Field(default=None, description="预估时间下限（秒）")
+    estimated_seconds_max: Optional[int] = Field(default=None, description="预估时间上限（秒）")
+
+
+class FileSummary(BaseModel):
+    """批量任务文件统计摘要"""
+    model_config = _RESP_CONFIG
+
+    valid_files: int = Field(description="有效文件数", example=5)
+    invalid_files: int = Field(description="无效文件数", example=0)
+    total_size_mb: float = Field(description="总文件大小（MB）", example=76.4)
 
 
 class BatchStatusResponse(BaseModel):
     """批量任务状态响应"""
+    model_config = _RESP_CONFIG
+
     task_id: str = Field(description="任务ID")
     status: str = Field(description="任务状态")
     priority: int = Field(description="任务优先级")
     progress: BatchProgress = Field(description="进度信息")
     timing: BatchTiming = Field(description="时间信息")
-    file_summary: Dict[str, Any] = Field(description="文件统计摘要")
+    file_summary: FileSummary = Field(description="文件统计摘要")
 
 
 class BatchListResponse(BaseModel):
     """批量任务列表响应"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(description="查询是否成功", example=True)
     total_count: int = Field(description="任务总数", example=5)
     tasks: List[BatchTaskSummary] = Field(description="任务列表")
 
 
-class ProgressStatus(BaseModel):
+class ProgressStatus(_ProgressBase):
     """进度状态信息"""
     request_id: str = Field(description="请求ID")
     current_step: str = Field(description="当前分析步骤")
@@ -339,36 +440,32 @@ class ProgressStatus(BaseModel):
     step_progress: float = Field(description="步骤进度（0-100）", example=65.0)
     overall_progress: float = Field(description="总体进度（0-100）", example=72.3)
     elapsed_time: float = Field(description="已用时间（秒）", example=35.2)
-    estimated_remaining: Optional[str] = Field(default=None, description="预计剩余时间", example="1分20秒")
     step_start_time: float = Field(description="步骤开始时间戳")
 
 
+class ActiveTaskInfo(_ProgressBase):
+    """活跃任务简要信息"""
+    request_id: str = Field(description="请求ID")
+    current_step: str = Field(description="当前分析步骤")
+    step_description: str = Field(description="步骤描述")
+    overall_progress: float = Field(description="总体进度（0-100）")
+    elapsed_time: float = Field(description="已用时间（秒）")
+
+
 class ProgressSummary(BaseModel):
     """进度摘要信息"""
+    model_config = _RESP_CONFIG
+
     total_active: int = Field(description="活跃任务总数", example=3)
     by_step: Dict[str, int] = Field(description="各步骤任务数量", example={"audio_separation": 1, "beat_tracking": 2})
     average_progress: float = Field(description="平均进度", example=65.5)
-    active_tasks: Optional[List[Dict[str, Any]]] = Field(default=None, description="活跃任务详情")
-
-
-class AsyncAnalysisData(BaseModel):
-    """异步分析数据"""
-    bpm: float = Field(description="每分钟节拍数", example=120.5)
-    beats: List[float] = Field(description="节拍时间点数组", example=[0.33, 0.75, 1.14, 1.56])
-    downbeats: List[float] = Field(description="强拍时间点数组", example=[0.33, 1.94, 3.53])
-    beat_positions: List[int] = Field(description="节拍位置数组", example=[1, 2, 3, 4, 1, 2, 3, 4])
-    segments: List[Dict[str, Any]] = Field(
-        description="音乐段落数组",
-        example=[
-            {"start": 0.0, "end": 0.33, "label": "start"},
-            {"start": 0.33, "end": 13.13, "label": "intro"},
-            {"start": 13.13, "end": 37.53, "label": "chorus"}
-        ]
-    )
+    active_tasks: Optional[List[ActiveTaskInfo]] = Field(default=None, description="活跃任务详情")
 
 
 class AsyncAnalysisFile(BaseModel):
     """异步分析生成文件"""
+    model_config = _RESP_CONFIG
+
     url: str = Field(description="下载链接", example="/api/files/download/result_20241123_001.json")
     filename: str = Field(description="文件名", example="result_20241123_001.json")
     size: str = Field(description="文件大小", example="2.3KB")
@@ -376,26 +473,34 @@ class AsyncAnalysisFile(BaseModel):
 
 class AsyncAnalysisFiles(BaseModel):
     """异步分析生成文件集合"""
+    model_config = _RESP_CONFIG
+
     result_json: AsyncAnalysisFile = Field(description="分析结果JSON文件")
 
 
 class AsyncAnalysisResultSuccess(BaseModel):
     """异步分析成功结果"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(default=True, description="请求是否成功", example=True)
     message: str = Field(description="状态消息", example="分析完成")
-    data: AsyncAnalysisData = Field(description="分析结果数据")
+    data: AnalysisResult = Field(description="分析结果数据")
     files: AsyncAnalysisFiles = Field(description="生成文件信息")
     processing_time: float = Field(description="处理时间（秒）", example=30.5)
 
 
 class AsyncAnalysisResultPending(BaseModel):
     """异步分析排队中结果"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(default=False, description="请求是否成功", example=False)
     message: str = Field(description="状态消息", example="任务排队中，请稍后再试")
 
 
 class AsyncAnalysisResultProcessing(BaseModel):
     """异步分析进行中结果"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(default=False, description="请求是否成功", example=False)
     message: str = Field(description="状态消息", example="正在分析中，请稍后再试")
     progress_url: str = Field(description="进度查询URL", example="/api/progress/req_20241123_001")
@@ -403,16 +508,51 @@ class AsyncAnalysisResultProcessing(BaseModel):
 
 class AsyncAnalysisResultFailed(BaseModel):
     """异步分析失败结果"""
+    model_config = _RESP_CONFIG
+
     success: bool = Field(default=False, description="请求是否成功", example=False)
     message: str = Field(description="状态消息", example="分析失败")
     error: str = Field(description="错误信息", example="音频格式不支持")
 
 
+class ModelInfo(BaseModel):
+    """分析模型信息"""
+    model_config = _RESP_CONFIG
+
+    description: str = Field(description="模型描述")
+    estimated_time: Dict[str, str] = Field(
+        description="不同文件大小的预估处理时间",
+        example={"small_file": "30-60秒", "medium_file": "60-120秒"}
+    )
+    recommended: bool = Field(description="是否推荐使用")
+
+
+class FormatInfo(BaseModel):
+    """音频格式信息"""
+    model_config = _RESP_CONFIG
+
+    name: str = Field(description="格式名称", example="WAV")
+    description: str = Field(description="格式说明")
+    recommended: bool = Field(description="是否推荐使用")
+
+
 class SystemInfo(BaseModel):
     """分析服务信息"""
+    model_config = _RESP_CONFIG
+
     service: str = Field(description="服务名称", example="音乐分析API")
     version: str = Field(description="服务版本", example="1.0.0")
-    models: Dict[str, Dict[str, Any]] = Field(description="可用模型信息")
-    limitations: Dict[str, str] = Field(description="使用限制")
-    supported_formats: Dict[str, Dict[str, Any]] = Field(description="支持的文件格式")
-    features: Dict[str, bool] = Field(description="功能特性")
\ No newline at end of file
+    models: Dict[str, ModelInfo] = Field(description="可用模型信息")
+    limitations: Dict[str, Union[str, int]] = Field(description="使用限制")
+    supported_formats: Dict[str, FormatInfo] = Field(description="支持的文件格式")
+    features: Dict[str, bool] = Field(description="功能特性")
+
+
+@lru_cache(maxsize=None)
+def get_response_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """
+    获取响应模型的序列化器
+
+    首次使用时才构建并缓存，保持defer_build不在导入时构建模型的效果
+    """
+    return TypeAdapter(model)
@@ -4,20 +4,17 @@
 """
 
 import os
-import sys
 import time
+import queue
 import asyncio
 import uuid
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any
-from datetime import datetime
+from typing import List, Dict, Optional, Set, Tuple, Any, Callable
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict
 import json
 
-# 添加项目根目录到Python路径，以便导入allin1
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root / "src"))
-
-import allin1
+import aiofiles
 import structlog
 from ..models import (
     AnalysisRequest,
@@ -25,13 +22,37 @@ from ..models import (
     BatchAnalysisRequest,
     FileLinks,
     BatchResultResponse,
-    TaskStatus
+    TaskStatus,
+    get_response_adapter
 )
-from ..utils import generate_unique_filename, ensure_directory
+from ..utils import generate_unique_filename, ensure_directory, copy_upload_file
 from .progress_tracker import ProgressTracker, AnalysisStep
+from .analysis_worker import (
+    get_executor,
+    get_analysis_semaphore,
+    analyze_and_serialize,
+    analyze_batch_and_serialize,
+    create_progress_queue,
+    get_progress_executor
+)
 
 logger = structlog.get_logger()
 
+# 批量任务每次分析调用处理的文件数（分块之间更新进度）
+BATCH_CHUNK_SIZE = 8
+
+# 等待进度事件的单次超时（秒），超时后检查分析是否已结束
+PROGRESS_POLL_INTERVAL = 1.0
+
+# 分析结束后等待进度转发收尾的最长时间（秒）
+PROGRESS_DRAIN_TIMEOUT = 5.0
+
+# 内存中保留的批量任务数上限
+MAX_BATCH_TASKS = 1000
+
+# 已结束（可移出内存）的批量任务状态
+FINISHED_TASK_STATUSES = ("completed", "failed", "cancelled")
+
 class AnalysisService:
     """音频分析服务"""
 
@@ -41,12 +62,15 @@ class AnalysisService:
         self.temp_dir = Path("api/temp")
 
         # 批量任务管理
-        self.batch_tasks: Dict[str, Dict] = {}
+        # 按完成顺序排列，超出上限时最早完成的任务持久化到磁盘后移出内存
+        self.batch_tasks: "OrderedDict[str, Dict]" = OrderedDict()
 
-        # 确保目录存在
-        asyncio.create_task(ensure_directory(self.upload_dir))
-        asyncio.create_task(ensure_directory(self.results_dir))
-        asyncio.create_task(ensure_directory(self.temp_dir))
+        # 常驻分析进程池（缓存已加载的模型）
+        self._executor = get_executor()
+
+        # 确保目录存在（服务在模块导入时创建，此时事件循环可能尚未运行）
+        for directory in (self.upload_dir, self.results_dir, self.temp_dir):
+            directory.mkdir(parents=True, exist_ok=True)
 
     async def analyze_single_file_with_progress(
         self,
@@ -79,26 +103,12 @@ class AnalysisService:
                 device=device
             )
 
-            # 步骤1：初始化
+            # 步骤1：初始化，准备输出目录
             tracker.update_step(AnalysisStep.INITIALIZING, 0)
-            await asyncio.sleep(0.1)  # 让进度更新有时间传播
-            tracker.update_step_progress(100)
-
-            # 步骤2：准备输出目录
-            tracker.update_step(AnalysisStep.INITIALIZING, 50)
             output_dir = self.results_dir / f"analysis_{request_id}"
             await ensure_directory(output_dir)
-            tracker.update_step_progress(100)
-
-            # 步骤3：加载模型（模拟进度）
-            tracker.update_step(AnalysisStep.LOADING_MODEL, 0)
-            # 模拟模型加载过程
-            for i in range(0, 101, 10):
-                tracker.update_step_progress(i)
-                await asyncio.sleep(0.1)  # 模拟加载时间
 
-            # 步骤4：构建allin1分析参数
-            tracker.update_step(AnalysisStep.AUDIO_SEPARATION, 0)
+            # 步骤2：构建allin1分析参数
             kwargs = {
                 "paths": [str(file_path)],
                 "model": request.model.value,
@@ -112,46 +122,32 @@ class AnalysisService:
                 "multiprocess": False  # 在API环境中使用单进程
             }
 
-            # 执行分析（这是最耗时的部分）
-            tracker.update_step_progress(50)
-
-            # 由于allin1.analyze()是同步的，我们在单独的线程中运行
-            loop = asyncio.get_event_loop()
-
-            # 在后台更新进度，让用户知道分析正在进行
-            async def update_progress_during_analysis():
-                progress_values = [60, 70, 80, 90]
-                for progress in progress_values:
-                    await asyncio.sleep(2)  # 每2秒更新一次
+            # 步骤3：执行分析（这是最耗时的部分，含工作进程首次使用时的模型加载）
+            # 工作进程在实际阶段切换时推送进度事件，同步到进度跟踪器
+            def on_progress(step: str, progress: float, file_name: Optional[str]):
+                step = AnalysisStep(step)
+                if step == tracker.current_step:
                     tracker.update_step_progress(progress)
-                    if tracker.current_step != AnalysisStep.AUDIO_SEPARATION:
-                        break
-
-            # 启动进度更新任务
-            progress_task = asyncio.create_task(update_progress_during_analysis())
-
-            try:
-                # 执行实际的分析
-                results = await loop.run_in_executor(
-                    None,
-                    lambda: allin1.analyze(**kwargs)
-                )
-                progress_task.cancel()
-            except asyncio.CancelledError:
-                pass
+                else:
+                    tracker.update_step(step, progress)
+
+            # 执行实际的分析（结果在工作进程中完成转换）
+            result_fields = await self._run_in_worker(
+                analyze_and_serialize,
+                kwargs,
+                str(file_path),
+                request.inline_arrays,
+                on_progress=on_progress
+            )
 
             tracker.update_step_progress(100)
 
-            # 步骤5：处理结果
+            # 步骤4：处理结果
             tracker.update_step(AnalysisStep.GENERATING_RESULTS, 0)
-            analysis_result = results[0] if isinstance(results, list) else results
-            tracker.update_step_progress(50)
-
-            # 转换为我们的响应格式
-            analysis_result_data = self._convert_allin1_result(analysis_result, file_path)
+            analysis_result_data = AnalysisResult(**result_fields)
             tracker.update_step_progress(100)
 
-            # 步骤6：生成文件下载链接
+            # 步骤5：生成文件下载链接
             tracker.update_step(AnalysisStep.SAVING_OUTPUTS, 0)
             file_links = self._generate_file_links(
                 file_path,
@@ -200,57 +196,77 @@ class AnalysisService:
         """
         return await self.analyze_single_file_with_progress(file_path, request, request_id)
 
-    def _convert_allin1_result(self, result, original_path: Path) -> AnalysisResult:
+    async def _run_in_worker(
+        self,
+        func: Callable,
+        kwargs: Dict[str, Any],
+        *args: Any,
+        on_progress: Callable[[str, float, Optional[str]], None]
+    ) -> Any:
         """
-        将allin1分析结果转换为我们的格式
+        在分析进程池中执行任务，并将工作进程推送的进度事件转发给回调
 
         Args:
-            result: allin1分析结果
-            original_path: 原始文件路径
+            func: 工作进程中执行的函数，kwargs中会附带progress_queue
+            kwargs: 分析参数
+            *args: 传给func的其他参数
+            on_progress: 进度回调，参数为 (步骤, 步骤进度, 文件名)
 
         Returns:
-            AnalysisResult: 转换后的结果
+            Any: func的返回值
         """
-        # 转换segments
-        segments = []
-        for segment in result.segments:
-            segments.append({
-                "start": float(segment.start),
-                "end": float(segment.end),
-                "label": segment.label
-            })
-
-        # 构建结果数据
-        result_data = AnalysisResult(
-            path=str(original_path),
-            bpm=float(result.bpm),
-            beats=[float(beat) for beat in result.beats],
-            downbeats=[float(downbeat) for downbeat in result.downbeats],
-            beat_positions=[int(pos) for pos in result.beat_positions],
-            segments=segments
-        )
+        loop = asyncio.get_event_loop()
+        progress_executor = get_progress_executor()
+        finished = False
 
-        # 添加激活数据（如果有）
-        if hasattr(result, 'activations') and result.activations:
-            result_data.activations = {
-                "beat": result.activations.get("beat", []).tolist() if hasattr(result.activations.get("beat", []), "tolist") else result.activations.get("beat", []),
-                "downbeat": result.activations.get("downbeat", []).tolist() if hasattr(result.activations.get("downbeat", []), "tolist") else result.activations.get("downbeat", []),
-                "segment": result.activations.get("segment", []).tolist() if hasattr(result.activations.get("segment", []), "tolist") else result.activations.get("segment", []),
-                "label": result.activations.get("label", []).tolist() if hasattr(result.activations.get("label", []), "tolist") else result.activations.get("label", [])
-            }
+        async def drain_progress():
+            # 带超时的get在专用线程池中执行，空闲时不占用事件循环和默认线程池
+            while True:
+                try:
+                    event = await loop.run_in_executor(
+                        progress_executor, progress_queue.get, True, PROGRESS_POLL_INTERVAL
+                    )
+                except queue.Empty:
+                    if finished:
+                        break
+                    continue
+                if event is None:
+                    break
+                # 进度回调出错只记录日志，不影响分析结果
+                try:
+                    on_progress(*event)
+                except Exception as e:
+                    logger.warning("进度回调执行失败", event=event, error=str(e))
 
-        # 添加嵌入数据（如果有）
-        if hasattr(result, 'embeddings') and result.embeddings is not None:
-            result_data.embeddings = result.embeddings.flatten().tolist() if hasattr(result.embeddings, "flatten") else result.embeddings
+        # 超出并发上限的请求在此等待，不占用进度队列和线程
+        async with get_analysis_semaphore():
+            progress_queue = create_progress_queue()
+            progress_task = asyncio.create_task(drain_progress())
 
-        return result_data
+            try:
+                return await loop.run_in_executor(
+                    self._executor,
+                    func,
+                    dict(kwargs, progress_queue=progress_queue),
+                    *args
+                )
+            finally:
+                finished = True
+                # 转发进度的异常或超时不能覆盖分析结果或分析本身的错误
+                try:
+                    progress_queue.put(None)
+                    await asyncio.wait_for(progress_task, PROGRESS_DRAIN_TIMEOUT)
+                except Exception as e:
+                    progress_task.cancel()
+                    logger.warning("进度转发未正常结束", error=str(e))
 
     def _generate_file_links(
         self,
         file_path: Path,
         output_dir: Path,
         request: AnalysisRequest,
-        request_id: str
+        request_id: str,
+        existing: Optional[Set[str]] = None
     ) -> FileLinks:
         """
         生成文件下载链接
@@ -260,43 +276,57 @@ class AnalysisService:
             output_dir: 输出目录
             request: 分析请求
             request_id: 请求ID
+            existing: 输出目录中已有的文件名（批量处理时可复用，未提供时扫描目录）
 
         Returns:
             FileLinks: 文件下载链接
         """
-        file_links = FileLinks()
+        if existing is None:
+            existing = self._list_output_files(output_dir)
+
+        links = {}
         base_filename = file_path.stem
+        url_prefix = f"/api/files/download/analysis_{request_id}"
 
         # 可视化文件
         if request.visualize:
-            viz_file = output_dir / f"{base_filename}.pdf"
-            if viz_file.exists():
-                file_links.visualization = f"/api/files/download/analysis_{request_id}/{viz_file.name}"
+            viz_name = f"{base_filename}.pdf"
+            if viz_name in existing:
+                links["visualization"] = f"{url_prefix}/{viz_name}"
 
         # 音频化文件
         if request.sonify:
-            sonif_file = output_dir / f"{base_filename}.sonif.wav"
-            if sonif_file.exists():
-                file_links.sonification = f"/api/files/download/analysis_{request_id}/{sonif_file.name}"
+            sonif_name = f"{base_filename}.sonif.wav"
+            if sonif_name in existing:
+                links["sonification"] = f"{url_prefix}/{sonif_name}"
 
         # JSON结果文件
-        json_file = output_dir / f"{base_filename}.json"
-        if json_file.exists():
-            file_links.json_result = f"/api/files/download/analysis_{request_id}/{json_file.name}"
+        json_name = f"{base_filename}.json"
+        if json_name in existing:
+            links["json_result"] = f"{url_prefix}/{json_name}"
 
         # 激活数据文件
         if request.include_activations:
-            activ_file = output_dir / f"{base_filename}.activ.npz"
-            if activ_file.exists():
-                file_links.activations = f"/api/files/download/analysis_{request_id}/{activ_file.name}"
+            activ_name = f"{base_filename}.activ.npz"
+            if activ_name in existing:
+                links["activations"] = f"{url_prefix}/{activ_name}"
 
         # 嵌入向量文件
         if request.include_embeddings:
-            embed_file = output_dir / f"{base_filename}.embed.npy"
-            if embed_file.exists():
-                file_links.embeddings = f"/api/files/download/analysis_{request_id}/{embed_file.name}"
+            embed_name = f"{base_filename}.embed.npy"
+            if embed_name in existing:
+                links["embeddings"] = f"{url_prefix}/{embed_name}"
+
+        return FileLinks(**links)
 
-        return file_links
+    @staticmethod
+    def _list_output_files(output_dir: Path) -> Set[str]:
+        """一次扫描输出目录，返回其中的文件名集合"""
+        try:
+            with os.scandir(output_dir) as entries:
+                return {entry.name for entry in entries}
+        except FileNotFoundError:
+            return set()
 
     async def create_batch_task(
         self,
@@ -317,19 +347,11 @@ class AnalysisService:
         """
         task_id = f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{str(uuid.uuid4())[:8]}"
 
-        # 保存上传的文件
-        file_paths = []
-        for file in files:
-            unique_filename = generate_unique_filename(file.filename or "audio")
-            upload_path = self.upload_dir / unique_filename
-
-            with open(upload_path, "wb") as f:
-                content = await file.read()
-                f.write(content)
-
-            file_paths.append(upload_path)
+        # 并发保存上传的文件
+        file_paths = list(await asyncio.gather(*(self._save_upload(file) for file in files)))
 
         # 创建任务记录
+        now_ts = time.monotonic()
         self.batch_tasks[task_id] = {
             "id": task_id,
             "status": "pending",
@@ -340,10 +362,13 @@ class AnalysisService:
             "total_files": len(file_paths),
             "file_paths": file_paths,
             "request": request,
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
+            "created_at": datetime.now(timezone.utc),
+            # 单调时钟时间戳：每次变更只记录浮点数，updated_at在查询状态时才换算
+            "_created_ts": now_ts,
+            "_updated_ts": now_ts,
             "results": {},
-            "estimated_time": f"{len(file_paths) * 30}-{len(file_paths) * 60}秒"
+            "estimated_seconds_min": len(file_paths) * 30,
+            "estimated_seconds_max": len(file_paths) * 60
         }
 
         # 添加后台任务
@@ -358,6 +383,24 @@ class AnalysisService:
 
         return task_id
 
+    async def _save_upload(self, file: Any) -> Path:
+        """
+        保存单个上传文件到上传目录
+
+        Args:
+            file: UploadFile对象
+
+        Returns:
+            Path: 保存后的文件路径
+        """
+        upload_path = self.upload_dir / generate_unique_filename(file.filename or "audio")
+
+        # 在线程中一次性完成复制，避免每个分块都在事件循环与线程池之间往返
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, copy_upload_file, file.file, upload_path, file.size)
+
+        return upload_path
+
     async def _process_batch_task(self, task_id: str):
         """
         处理批量分析任务（后台运行）
@@ -375,65 +418,95 @@ class AnalysisService:
         try:
             # 更新任务状态为处理中
             task["status"] = "processing"
-            task["updated_at"] = datetime.now().isoformat()
+            task["_updated_ts"] = time.monotonic()
 
             total_files = len(file_paths)
+            output_dir = self.results_dir / f"analysis_{task_id}"
+            await ensure_directory(output_dir)
 
-            for i, file_path in enumerate(file_paths):
-                try:
-                    # 更新当前处理文件
-                    task["current_file"] = file_path.name
-                    task["progress"] = (i / total_files) * 100
-                    task["updated_at"] = datetime.now().isoformat()
-
-                    # 创建单个文件分析请求（强制使用CPU）
-                    single_request = AnalysisRequest(
-                        model=request.model,
-                        device=DeviceType.CPU,  # 强制使用CPU
-                        visualize=request.visualize,
-                        sonify=request.sonify,
-                        include_activations=request.include_activations,
-                        include_embeddings=request.include_embeddings,
-                        overwrite=request.overwrite
-                    )
+            # 同一分块内的文件通过一次分析调用完成（强制使用CPU）
+            kwargs = {
+                "model": request.model.value,
+                "device": "cpu",
+                "out_dir": str(output_dir),
+                "visualize": output_dir if request.visualize else False,
+                "sonify": output_dir if request.sonify else False,
+                "include_activations": request.include_activations,
+                "include_embeddings": request.include_embeddings,
+                "overwrite": request.overwrite,
+                "multiprocess": False
+            }
 
-                    # 分析文件
-                    result_data, file_links = await self.analyze_single_file(
-                        file_path,
-                        single_request,
-                        f"{task_id}_{i}"
-                    )
+            for start in range(0, total_files, BATCH_CHUNK_SIZE):
+                chunk = file_paths[start:start + BATCH_CHUNK_SIZE]
 
-                    # 保存结果
-                    task["results"][file_path.name] = {
-                        "data": result_data,
-                        "files": file_links
-                    }
+                # 更新当前处理文件
+                task["current_file"] = chunk[0].name
+                task["progress"] = (start / total_files) * 100
+                task["_updated_ts"] = time.monotonic()
 
-                    # 添加到已完成列表
-                    task["completed_files"].append(file_path.name)
+                # 分块内每个文件推理完成时更新任务进度
+                def on_progress(step: str, progress: float, file_name: Optional[str]):
+                    if step == AnalysisStep.FEATURE_EXTRACTION.value and file_name:
+                        task["current_file"] = file_name
+                        task["progress"] = (start + len(chunk) * progress / 100) / total_files * 100
+                        task["_updated_ts"] = time.monotonic()
 
-                    logger.info(
-                        "批量任务文件处理完成",
-                        task_id=task_id,
-                        file_name=file_path.name,
-                        progress=f"{((i+1)/total_files)*100:.1f}%"
+                try:
+                    results_by_name = await self._run_in_worker(
+                        analyze_batch_and_serialize,
+                        dict(kwargs, paths=[str(p) for p in chunk]),
+                        request.inline_arrays,
+                        on_progress=on_progress
                     )
-
                 except Exception as e:
                     logger.error(
-                        "批量任务文件处理失败",
+                        "批量任务分块处理失败",
                         task_id=task_id,
-                        file_name=file_path.name,
+                        file_names=[p.name for p in chunk],
                         error=str(e)
                     )
-                    task["failed_files"].append(file_path.name)
+                    task["failed_files"].extend(p.name for p in chunk)
+                    continue
+
+                existing = self._list_output_files(output_dir)
+
+                for file_path in chunk:
+                    try:
+                        result_fields = results_by_name.get(file_path.name)
+                        if result_fields is None:
+                            raise ValueError("未返回分析结果")
+
+                        # 保存结果
+                        task["results"][file_path.name] = {
+                            "data": AnalysisResult(**result_fields),
+                            "files": self._generate_file_links(file_path, output_dir, request, task_id, existing)
+                        }
+
+                        # 添加到已完成列表
+                        task["completed_files"].append(file_path.name)
+
+                    except Exception as e:
+                        logger.error(
+                            "批量任务文件处理失败",
+                            task_id=task_id,
+                            file_name=file_path.name,
+                            error=str(e)
+                        )
+                        task["failed_files"].append(file_path.name)
+
+                done = min(start + BATCH_CHUNK_SIZE, total_files)
+                logger.info(
+                    "批量任务分块处理完成",
+                    task_id=task_id,
+                    progress=f"{(done / total_files) * 100:.1f}%"
+                )
 
             # 任务完成
             task["status"] = "completed"
             task["progress"] = 100.0
             task["current_file"] = None
-            task["updated_at"] = datetime.now().isoformat()
+            task["_updated_ts"] = time.monotonic()
 
             logger.info(
                 "批量分析任务完成",
@@ -449,9 +522,43 @@ class AnalysisService:
                 error=str(e)
             )
             task["status"] = "failed"
-            task["updated_at"] = datetime.now().isoformat()
+            task["_updated_ts"] = time.monotonic()
+
+        finally:
+            await self._evict_finished_tasks(task_id)
+
+    def _task_archive_path(self, task_id: str) -> Path:
+        """已移出内存的批量任务结果文件路径"""
+        return self.results_dir / f"{task_id}.task.json"
+
+    async def _evict_finished_tasks(self, task_id: str):
+        """
+        将刚结束的任务移到末尾，并把超出上限的最早结束任务写入磁盘
+
+        Args:
+            task_id: 刚结束的任务ID
+        """
+        if task_id in self.batch_tasks:
+            self.batch_tasks.move_to_end(task_id)
+
+        excess = len(self.batch_tasks) - MAX_BATCH_TASKS
+        if excess <= 0:
+            return
+
+        evict_ids = [
+            old_id for old_id, old_task in self.batch_tasks.items()
+            if old_task["status"] in FINISHED_TASK_STATUSES
+        ][:excess]
+
+        for old_id in evict_ids:
+            response = self._build_task_status(old_id, self.batch_tasks.pop(old_id))
+            try:
+                async with aiofiles.open(self._task_archive_path(old_id), "wb") as f:
+                    await f.write(get_response_adapter(BatchResultResponse).dump_json(response, exclude_none=True))
+            except Exception as e:
+                logger.error("批量任务持久化失败", task_id=old_id, error=str(e))
 
-    async def get_batch_task_status(self, task_id: str) -> Optional[Dict]:
+    async def get_batch_task_status(self, task_id: str) -> Optional[BatchResultResponse]:
         """
         获取批量任务状态
 
@@ -459,43 +566,41 @@ class AnalysisService:
             task_id: 任务ID
 
         Returns:
-            Optional[Dict]: 任务状态和结果
+            Optional[BatchResultResponse]: 任务状态和结果
         """
-        if task_id not in self.batch_tasks:
-            return None
+        task = self.batch_tasks.get(task_id)
+        if task is not None:
+            return self._build_task_status(task_id, task)
 
-        task = self.batch_tasks[task_id]
+        # 内存中没有时查找已持久化的任务（重新校验为模型，与内存中的任务返回相同的类型）
+        archive_path = self._task_archive_path(task_id)
+        try:
+            async with aiofiles.open(archive_path, "rb") as f:
+                return get_response_adapter(BatchResultResponse).validate_json(await f.read())
+        except FileNotFoundError:
+            return None
 
+    def _build_task_status(self, task_id: str, task: Dict) -> BatchResultResponse:
+        """根据任务记录构建状态响应"""
         # 计算预计剩余时间
-        estimated_remaining = None
+        estimated_seconds_min = None
+        estimated_seconds_max = None
         if task["status"] == "processing" and task["progress"] > 0:
             completed_count = len(task["completed_files"]) + len(task["failed_files"])
             remaining_count = task["total_files"] - completed_count
 
             if completed_count > 0:
-                elapsed_time = (datetime.now() - datetime.fromisoformat(task["created_at"])).total_seconds()
+                elapsed_time = time.monotonic() - task["_created_ts"]
                 avg_time_per_file = elapsed_time / completed_count
                 estimated_seconds = remaining_count * avg_time_per_file
-                estimated_remaining = f"{int(estimated_seconds // 60)}-{int((estimated_seconds // 60) + 1)}分钟"
-
-        # 构建响应
-        response = {
-            "success": True,
-            "task_id": task_id,
-            "status": TaskStatus(
-                task_id=task_id,
-                status=task["status"],
-                progress=task["progress"],
-                current_file=task["current_file"],
-                completed_files=task["completed_files"],
-                failed_files=task["failed_files"],
-                estimated_remaining=estimated_remaining,
-                created_at=task["created_at"],
-                updated_at=task["updated_at"]
-            ).dict()
-        }
+                estimated_minutes = int(estimated_seconds // 60)
+                estimated_seconds_min = estimated_minutes * 60
+                estimated_seconds_max = (estimated_minutes + 1) * 60
 
         # 如果任务完成，添加结果
+        results = None
+        all_files = None
+        total_processing_time = None
         if task["status"] == "completed":
             results = []
             all_files = {}
@@ -505,14 +610,28 @@ class AnalysisService:
                 if result_data["files"]:
                     all_files[file_name] = result_data["files"]
 
-            response["results"] = results
-            response["files"] = all_files
-            response["total_processing_time"] = (
-                datetime.fromisoformat(task["updated_at"]) -
-                datetime.fromisoformat(task["created_at"])
-            ).total_seconds()
+            total_processing_time = task["_updated_ts"] - task["_created_ts"]
 
-        return response
+        # 构建响应
+        return BatchResultResponse(
+            success=True,
+            task_id=task_id,
+            status=TaskStatus(
+                task_id=task_id,
+                status=task["status"],
+                progress=task["progress"],
+                current_file=task["current_file"],
+                completed_files=task["completed_files"],
+                failed_files=task["failed_files"],
+                estimated_seconds_min=estimated_seconds_min,
+                estimated_seconds_max=estimated_seconds_max,
+                created_at=task["created_at"],
+                updated_at=task["created_at"] + timedelta(seconds=task["_updated_ts"] - task["_created_ts"])
+            ),
+            results=results,
+            files=all_files,
+            total_processing_time=total_processing_time
+        )
 
     async def cancel_batch_task(self, task_id: str) -> bool:
         """
@@ -531,7 +650,7 @@ class AnalysisService:
 
         if task["status"] in ["pending", "processing"]:
             task["status"] = "cancelled"
-            task["updated_at"] = datetime.now().isoformat()
+            task["_updated_ts"] = time.monotonic()
 
             logger.info("批量任务已取消", task_id=task_id)
             return True
@@ -0,0 +1,327 @@
+"""
+分析工作进程
+在常驻进程池中执行allin1分析流程及结果转换，并缓存已加载的模型，
+避免每次请求都重新加载模型权重，同时绕开GIL使独立请求可并行执行；
+并发分析数由MAX_CONCURRENT_ANALYSES环境变量限制
+"""
+
+import os
+import base64
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+# 默认分析模型（API只使用CPU）
+DEFAULT_MODEL = "harmonix-all"
+DEFAULT_DEVICE = "cpu"
+
+# 同时进行的分析数上限（每个使用过的分析进程各常驻一份模型，需按内存容量设置）
+MAX_CONCURRENT_ANALYSES = max(1, int(os.getenv("MAX_CONCURRENT_ANALYSES", "2")))
+
+# 每个分析进程使用的torch线程数，避免多进程同时运行时CPU超额订阅
+THREADS_PER_ANALYSIS = max(1, (os.cpu_count() or 1) // MAX_CONCURRENT_ANALYSES)
+
+# 分析结果中的激活数据类型
+ACTIVATION_KEYS = ("beat", "downbeat", "segment", "label")
+
+# 已加载的模型缓存（每个工作进程独立一份），键为 "模型名:设备"
+_MODEL_CACHE: Dict[str, Any] = {}
+
+# 全局共享的分析进程池
+_executor: Optional[ProcessPoolExecutor] = None
+
+# 用于跨进程传递进度事件的管理器
+_manager = None
+
+# 转发进度事件的线程池（每个运行中的分析占用一个线程，不挤占默认线程池）
+_progress_executor: Optional[ThreadPoolExecutor] = None
+
+# 限制同时提交到进程池的分析任务数（在事件循环中首次使用时创建）
+_analysis_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _get_model(model_name: str, device: str):
+    """获取已缓存的模型，首次使用时加载"""
+    key = f"{model_name}:{device}"
+    model = _MODEL_CACHE.get(key)
+    if model is None:
+        from allin1.models import load_pretrained_model
+
+        model = load_pretrained_model(model_name=model_name, device=device)
+        _MODEL_CACHE[key] = model
+        logger.info("分析模型已加载", model=model_name, device=device)
+    return model
+
+
+def _init_worker():
+    """工作进程初始化：限制torch线程数（模型在首次分析时才加载）"""
+    try:
+        import torch
+
+        torch.set_num_threads(THREADS_PER_ANALYSIS)
+    except ImportError:
+        pass
+
+
+def run_analysis(
+    paths: List[str],
+    model: str = DEFAULT_MODEL,
+    device: str = DEFAULT_DEVICE,
+    out_dir: Optional[str] = None,
+    visualize: Union[bool, str, Path] = False,
+    sonify: Union[bool, str, Path] = False,
+    include_activations: bool = False,
+    include_embeddings: bool = False,
+    overwrite: bool = False,
+    demix_dir: str = "./demix",
+    spec_dir: str = "./spec",
+    keep_byproducts: bool = False,
+    multiprocess: bool = False,
+    progress_queue: Any = None
+) -> List[Any]:
+    """
+    执行allin1分析流程（在工作进程中运行）
+
+    与allin1.analyze()的流程一致，但使用缓存的模型而非每次重新加载。
+    若传入progress_queue，进入各个阶段及每个文件推理完成时，
+    会向其推送 (AnalysisStep值, 步骤进度, 文件名) 事件
+
+    Returns:
+        List[allin1.AnalysisResult]: 按输入顺序排列的分析结果
+    """
+    import torch
+    from allin1.demix import demix
+    from allin1.spectrogram import extract_spectrograms
+    from allin1.helpers import (
+        run_inference,
+        expand_paths,
+        check_paths,
+        rmdir_if_empty,
+        save_results,
+    )
+    from allin1.utils import mkpath, load_result
+    from allin1.visualize import visualize as _visualize
+    from allin1.sonify import sonify as _sonify
+
+    paths = expand_paths([mkpath(p) for p in paths])
+    check_paths(paths)
+    demix_dir = mkpath(demix_dir)
+    spec_dir = mkpath(spec_dir)
+
+    # 跳过已有分析结果的文件
+    if out_dir is None or overwrite:
+        todo_paths = paths
+        exist_paths = []
+    else:
+        out_paths = [mkpath(out_dir) / path.with_suffix(".json").name for path in paths]
+        todo_paths = [path for path, out_path in zip(paths, out_paths) if not out_path.exists()]
+        exist_paths = [out_path for out_path in out_paths if out_path.exists()]
+
+    results = [
+        load_result(
+            exist_path,
+            load_activations=include_activations,
+            load_embeddings=include_embeddings,
+        )
+        for exist_path in exist_paths
+    ]
+
+    def report(step: str, progress: float = 0.0, file_name: Optional[str] = None):
+        if progress_queue is not None:
+            progress_queue.put((step, progress, file_name))
+
+    demix_paths = []
+    spec_paths = []
+    if todo_paths:
+        # 工作进程首次分析时才加载模型，已缓存时此步骤立即完成
+        report("loading_model")
+        cached_model = _get_model(model, device)
+        report("audio_separation")
+        demix_paths = demix(todo_paths, demix_dir, device)
+        report("spectrogram_extraction")
+        spec_paths = extract_spectrograms(demix_paths, spec_dir, multiprocess)
+
+        report("feature_extraction")
+
+        with torch.no_grad():
+            for i, (path, spec_path) in enumerate(zip(todo_paths, spec_paths), 1):
+                result = run_inference(
+                    path=path,
+                    spec_path=spec_path,
+                    model=cached_model,
+                    device=device,
+                    include_activations=include_activations,
+                    include_embeddings=include_embeddings,
+                )
+                if out_dir is not None:
+                    save_results(result, out_dir)
+                results.append(result)
+                report("feature_extraction", i / len(todo_paths) * 100, path.name)
+
+    results.sort(key=lambda result: paths.index(result.path))
+
+    if visualize:
+        _visualize(results, out_dir="./viz" if visualize is True else visualize, multiprocess=multiprocess)
+
+    if sonify:
+        _sonify(results, out_dir="./sonif" if sonify is True else sonify, multiprocess=multiprocess)
+
+    # 清理中间产物
+    if not keep_byproducts:
+        for path in demix_paths:
+            for stem in ["bass", "drums", "other", "vocals"]:
+                (path / f"{stem}.wav").unlink(missing_ok=True)
+            rmdir_if_empty(path)
+        rmdir_if_empty(demix_dir / "htdemucs")
+        rmdir_if_empty(demix_dir)
+
+        for path in spec_paths:
+            path.unlink(missing_ok=True)
+        rmdir_if_empty(spec_dir)
+
+    return results
+
+
+def result_to_fields(result, original_path: str, inline_arrays: bool = False) -> Dict[str, Any]:
+    """
+    将allin1分析结果转换为AnalysisResult字段
+
+    Args:
+        result: allin1分析结果
+        original_path: 原始文件路径
+        inline_arrays: 是否内联激活数据和嵌入向量（否则客户端通过文件链接下载）
+
+    Returns:
+        Dict[str, Any]: 可直接用于构建AnalysisResult的字段
+    """
+    # 转换segments（allin1的起止时间为numpy标量，转换为Python浮点数）
+    segments = [
+        {"start": float(segment.start), "end": float(segment.end), "label": segment.label}
+        for segment in result.segments
+    ]
+
+    # numpy数组直接在C层转换为Python列表
+    fields = {
+        "path": original_path,
+        "bpm": float(result.bpm),
+        "beats": np.asarray(result.beats, dtype=np.float64).tolist(),
+        "downbeats": np.asarray(result.downbeats, dtype=np.float64).tolist(),
+        "beat_positions": np.asarray(result.beat_positions, dtype=np.int64).tolist(),
+        "segments": segments
+    }
+
+    if not inline_arrays:
+        return fields
+
+    # 添加激活数据（如果有）
+    if result.activations:
+        fields["activations"] = {
+            key: np.asarray(result.activations[key], dtype=np.float64).tolist()
+            for key in ACTIVATION_KEYS
+        }
+
+    # 添加嵌入数据（如果有）
+    # 以float32原始字节的base64编码传输，避免生成大量Python浮点对象
+    if result.embeddings is not None:
+        embeddings = np.ascontiguousarray(result.embeddings, dtype=np.float32)
+        fields["embeddings_b64"] = base64.b64encode(embeddings.tobytes()).decode("ascii")
+        fields["embeddings_shape"] = list(embeddings.shape)
+
+    return fields
+
+
+def analyze_and_serialize(
+    kwargs: Dict[str, Any],
+    original_path: str,
+    inline_arrays: bool = False
+) -> Dict[str, Any]:
+    """分析单个文件并在工作进程内完成结果转换"""
+    results = run_analysis(**kwargs)
+    return result_to_fields(results[0], original_path, inline_arrays)
+
+
+def analyze_batch_and_serialize(
+    kwargs: Dict[str, Any],
+    inline_arrays: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    一次分析多个文件并在工作进程内完成结果转换
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 文件名到结果字段的映射（转换失败的文件不包含在内）
+    """
+    # allin1会对路径排序，按文件名对应回原始路径
+    original_paths = {Path(p).name: p for p in kwargs["paths"]}
+    fields_by_name = {}
+    for result in run_analysis(**kwargs):
+        name = Path(result.path).name
+        try:
+            fields_by_name[name] = result_to_fields(
+                result,
+                original_paths.get(name, str(result.path)),
+                inline_arrays
+            )
+        except Exception as e:
+            logger.error("分析结果转换失败", file_name=name, error=str(e))
+    return fields_by_name
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """获取全局共享的分析进程池（首次调用时创建）"""
+    global _executor
+    if _executor is None:
+        # 使用spawn避免在已初始化torch线程的进程中fork
+        _executor = ProcessPoolExecutor(
+            max_workers=MAX_CONCURRENT_ANALYSES,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+    return _executor
+
+
+def get_analysis_semaphore() -> asyncio.Semaphore:
+    """获取全局共享的分析并发信号量（需在事件循环中调用）"""
+    global _analysis_semaphore
+    if _analysis_semaphore is None:
+        _analysis_semaphore = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+    return _analysis_semaphore
+
+
+def get_progress_executor() -> ThreadPoolExecutor:
+    """获取转发进度事件的线程池（首次调用时创建）"""
+    global _progress_executor
+    if _progress_executor is None:
+        _progress_executor = ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_ANALYSES,
+            thread_name_prefix="analysis-progress"
+        )
+    return _progress_executor
+
+
+def create_progress_queue():
+    """创建可传入工作进程的进度事件队列"""
+    global _manager
+    if _manager is None:
+        _manager = multiprocessing.get_context("spawn").Manager()
+    return _manager.Queue()
+
+
+def shutdown_executor():
+    """关闭分析进程池、进度转发线程池及进度管理器"""
+    global _executor, _manager, _progress_executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+    if _progress_executor is not None:
+        _progress_executor.shutdown(wait=False)
+        _progress_executor = None
+    if _manager is not None:
+        _manager.shutdown()
+        _manager = None
@@ -4,8 +4,10 @@
 """
 
 import time
+import heapq
 import asyncio
-from typing import Dict, Optional, Callable, Any
+from collections import Counter
+from typing import Dict, List, Optional, Callable, Any, Tuple
 from datetime import datetime
 from enum import Enum
 import structlog
@@ -25,6 +27,47 @@ class AnalysisStep(str, Enum):
     SAVING_OUTPUTS = "saving_outputs"
     COMPLETED = "completed"
 
+# 按流水线顺序排列的步骤及其在总体进度中的权重
+_STEP_ORDER = [
+    AnalysisStep.INITIALIZING,
+    AnalysisStep.LOADING_MODEL,
+    AnalysisStep.AUDIO_SEPARATION,
+    AnalysisStep.SPECTROGRAM_EXTRACTION,
+    AnalysisStep.FEATURE_EXTRACTION,
+    AnalysisStep.BEAT_TRACKING,
+    AnalysisStep.SEGMENT_ANALYSIS,
+    AnalysisStep.GENERATING_RESULTS,
+    AnalysisStep.SAVING_OUTPUTS,
+    AnalysisStep.COMPLETED,
+]
+_STEP_INDEX = {step: i for i, step in enumerate(_STEP_ORDER)}
+_STEP_WEIGHT = [0.02, 0.15, 0.25, 0.15, 0.08, 0.15, 0.15, 0.03, 0.02, 0.0]
+
+# 每个步骤之前所有步骤的权重之和（前缀和）
+_CUM_WEIGHT_BEFORE = [sum(_STEP_WEIGHT[:i]) for i in range(len(_STEP_WEIGHT))]
+
+# 各步骤的预计耗时（秒），格式为 (下限, 上限)
+_STEP_ESTIMATES = {
+    AnalysisStep.INITIALIZING: (1, 2),      # 1-2秒
+    AnalysisStep.LOADING_MODEL: (5, 15),     # 5-15秒
+    AnalysisStep.AUDIO_SEPARATION: (10, 30), # 10-30秒
+    AnalysisStep.SPECTROGRAM_EXTRACTION: (5, 15),  # 5-15秒
+    AnalysisStep.FEATURE_EXTRACTION: (3, 8), # 3-8秒
+    AnalysisStep.BEAT_TRACKING: (5, 12),     # 5-12秒
+    AnalysisStep.SEGMENT_ANALYSIS: (8, 20),  # 8-20秒
+    AnalysisStep.GENERATING_RESULTS: (2, 5), # 2-5秒
+    AnalysisStep.SAVING_OUTPUTS: (1, 3),     # 1-3秒
+}
+
+# 每个步骤之后所有步骤的预计耗时之和（后缀和），格式为 (下限, 上限)
+_TAIL_ESTIMATES = [
+    (
+        sum(_STEP_ESTIMATES.get(step, (0, 0))[0] for step in _STEP_ORDER[i + 1:]),
+        sum(_STEP_ESTIMATES.get(step, (0, 0))[1] for step in _STEP_ORDER[i + 1:])
+    )
+    for i in range(len(_STEP_ORDER))
+]
+
 class ProgressTracker:
     """单文件分析进度跟踪器"""
 
@@ -32,20 +75,10 @@ class ProgressTracker:
         self.request_id = request_id
         self.start_time = time.time()
         self.current_step = AnalysisStep.INITIALIZING
+        self._step_idx = _STEP_INDEX[self.current_step]
         self.step_progress = 0.0  # 当前步骤的进度 (0-100)
         self.overall_progress = 0.0  # 总体进度 (0-100)
         self.step_start_time = time.time()
-        self.step_estimates = {
-            AnalysisStep.INITIALIZING: (1, 2),      # 1-2秒
-            AnalysisStep.LOADING_MODEL: (5, 15),     # 5-15秒
-            AnalysisStep.AUDIO_SEPARATION: (10, 30), # 10-30秒
-            AnalysisStep.SPECTROGRAM_EXTRACTION: (5, 15),  # 5-15秒
-            AnalysisStep.FEATURE_EXTRACTION: (3, 8), # 3-8秒
-            AnalysisStep.BEAT_TRACKING: (5, 12),     # 5-12秒
-            AnalysisStep.SEGMENT_ANALYSIS: (8, 20),  # 8-20秒
-            AnalysisStep.GENERATING_RESULTS: (2, 5), # 2-5秒
-            AnalysisStep.SAVING_OUTPUTS: (1, 3),     # 1-3秒
-        }
         self.step_descriptions = {
             AnalysisStep.INITIALIZING: "初始化分析环境",
             AnalysisStep.LOADING_MODEL: "加载深度学习模型",
@@ -59,12 +92,22 @@ class ProgressTracker:
             AnalysisStep.COMPLETED: "分析完成"
         }
 
-        # 全局进度跟踪存储
+        # 全局进度跟踪存储（同ID的旧跟踪器先移除，保证统计准确）
+        ProgressTracker.remove_tracker(request_id)
         ProgressTracker._active_trackers[request_id] = self
+        ProgressTracker._step_counts[self.current_step] += 1
+        heapq.heappush(ProgressTracker._expiry_heap, (self.start_time, request_id))
 
     # 全局进度跟踪器存储
     _active_trackers: Dict[str, 'ProgressTracker'] = {}
 
+    # 按创建时间排序的 (start_time, request_id) 小顶堆，用于过期清理
+    _expiry_heap: List[Tuple[float, str]] = []
+
+    # 各步骤的活跃跟踪器数量及总体进度之和，随状态更新增量维护
+    _step_counts: Counter = Counter()
+    _progress_total: float = 0.0
+
     @classmethod
     def get_tracker(cls, request_id: str) -> Optional['ProgressTracker']:
         """获取进度跟踪器"""
@@ -73,26 +116,28 @@ class ProgressTracker:
     @classmethod
     def remove_tracker(cls, request_id: str) -> bool:
         """移除进度跟踪器"""
-        if request_id in cls._active_trackers:
-            del cls._active_trackers[request_id]
-            return True
-        return False
+        tracker = cls._active_trackers.pop(request_id, None)
+        if tracker is None:
+            return False
+        cls._step_counts[tracker.current_step] -= 1
+        cls._progress_total -= tracker.overall_progress
+        return True
 
     @classmethod
     def cleanup_expired(cls, max_age_hours: int = 24):
         """清理过期的进度跟踪器"""
-        current_time = time.time()
+        cutoff = time.time() - max_age_hours * 3600
+        heap = cls._expiry_heap
         expired_ids = []
 
-        for request_id, tracker in cls._active_trackers.items():
-            age_seconds = current_time - tracker.start_time
-            age_hours = age_seconds / 3600
-            if age_hours > max_age_hours:
+        # 只弹出已过期的条目；已被移除或被同ID新跟踪器替换的条目直接丢弃
+        while heap and heap[0][0] < cutoff:
+            start_time, request_id = heapq.heappop(heap)
+            tracker = cls._active_trackers.get(request_id)
+            if tracker is not None and tracker.start_time == start_time:
+                cls.remove_tracker(request_id)
                 expired_ids.append(request_id)
 
-        for request_id in expired_ids:
-            cls.remove_tracker(request_id)
-
         logger.info(
             "进度跟踪器清理完成",
             cleaned_count=len(expired_ids),
@@ -111,11 +156,16 @@ class ProgressTracker:
         """
         old_step = self.current_step
         self.current_step = step
+        self._step_idx = _STEP_INDEX[step]
         self.step_progress = max(0, min(100, step_progress))
         self.step_start_time = time.time()
 
+        if old_step != step and self._is_registered():
+            ProgressTracker._step_counts[old_step] -= 1
+            ProgressTracker._step_counts[step] += 1
+
         # 计算总体进度
-        self.overall_progress = self._calculate_overall_progress()
+        self._set_overall_progress(self._calculate_overall_progress())
 
         # 记录日志
         if old_step != step:
@@ -131,41 +181,29 @@ class ProgressTracker:
     def update_step_progress(self, progress: float):
         """更新当前步骤的进度"""
         self.step_progress = max(0, min(100, progress))
-        self.overall_progress = self._calculate_overall_progress()
+        self._set_overall_progress(self._calculate_overall_progress())
 
-    def _calculate_overall_progress(self) -> float:
-        """计算总体进度"""
-        # 为每个步骤分配权重
-        step_weights = {
-            AnalysisStep.INITIALIZING: 0.02,
-            AnalysisStep.LOADING_MODEL: 0.15,
-            AnalysisStep.AUDIO_SEPARATION: 0.25,
-            AnalysisStep.SPECTROGRAM_EXTRACTION: 0.15,
-            AnalysisStep.FEATURE_EXTRACTION: 0.08,
-            AnalysisStep.BEAT_TRACKING: 0.15,
-            AnalysisStep.SEGMENT_ANALYSIS: 0.15,
-            AnalysisStep.GENERATING_RESULTS: 0.03,
-            AnalysisStep.SAVING_OUTPUTS: 0.02,
-            AnalysisStep.COMPLETED: 1.0
-        }
+    def _is_registered(self) -> bool:
+        """是否仍在全局存储中（已移除的跟踪器不再计入统计）"""
+        return ProgressTracker._active_trackers.get(self.request_id) is self
 
-        # 计算已完成步骤的总权重
-        completed_weight = 0.0
-        for step, weight in step_weights.items():
-            if step == self.current_step:
-                completed_weight += weight * (self.step_progress / 100)
-                break
-            elif step.value < self.current_step.value:
-                completed_weight += weight
+    def _set_overall_progress(self, progress: float):
+        """更新总体进度并同步进度总和"""
+        if self._is_registered():
+            ProgressTracker._progress_total += progress - self.overall_progress
+        self.overall_progress = progress
 
-        return round(completed_weight * 100, 1)
+    def _calculate_overall_progress(self) -> float:
+        """计算总体进度"""
+        idx = self._step_idx
+        return round((_CUM_WEIGHT_BEFORE[idx] + _STEP_WEIGHT[idx] * self.step_progress / 100) * 100, 1)
 
     def get_status(self) -> Dict[str, Any]:
         """获取当前状态"""
         elapsed_time = time.time() - self.start_time
 
         # 估算剩余时间
-        estimated_remaining = self._estimate_remaining_time()
+        estimated_seconds_min, estimated_seconds_max = self._estimate_remaining_time()
 
         return {
             "request_id": self.request_id,
@@ -174,38 +212,29 @@ class ProgressTracker:
             "step_progress": round(self.step_progress, 1),
             "overall_progress": self.overall_progress,
             "elapsed_time": round(elapsed_time, 1),
-            "estimated_remaining": estimated_remaining,
+            "estimated_seconds_min": estimated_seconds_min,
+            "estimated_seconds_max": estimated_seconds_max,
             "step_start_time": self.step_start_time
         }
 
-    def _estimate_remaining_time(self) -> Optional[str]:
-        """估算剩余时间"""
+    def _estimate_remaining_time(self) -> Tuple[Optional[int], Optional[int]]:
+        """估算剩余时间（秒），返回(下限, 上限)"""
         if self.current_step == AnalysisStep.COMPLETED:
-            return None
+            return None, None
 
         # 计算当前步骤剩余时间
-        min_time, max_time = self.step_estimates.get(self.current_step, (0, 0))
+        min_time, max_time = _STEP_ESTIMATES.get(self.current_step, (0, 0))
         step_elapsed = time.time() - self.step_start_time
-        step_remaining = max(0, (min_time + max_time) / 2 - step_elapsed)
+        tail_min, tail_max = _TAIL_ESTIMATES[self._step_idx]
 
-        # 计算后续步骤时间
-        remaining_steps_time = 0
-        for step in AnalysisStep:
-            if step.value > self.current_step.value:
-                min_t, max_t = self.step_estimates.get(step, (0, 0))
-                remaining_steps_time += (min_t + max_t) / 2
+        # 加上后续步骤时间（按流水线顺序预先求和）
+        remaining_min = max(0, min_time - step_elapsed) + tail_min
+        remaining_max = max(0, max_time - step_elapsed) + tail_max
 
-        total_remaining = step_remaining + remaining_steps_time
+        if remaining_max > 0:
+            return int(remaining_min), int(remaining_max)
 
-        if total_remaining > 0:
-            if total_remaining < 60:
-                return f"{int(total_remaining)}秒"
-            else:
-                minutes = int(total_remaining // 60)
-                seconds = int(total_remaining % 60)
-                return f"{minutes}分{seconds}秒"
-
-        return None
+        return None, None
 
     def complete(self):
         """标记分析完成"""
@@ -274,16 +303,14 @@ class ProgressManager:
                 "average_progress": 0.0
             }
 
-        # 按步骤统计
-        by_step = {}
-        total_progress = 0.0
-
-        for tracker in trackers.values():
-            step = tracker.current_step.value
-            by_step[step] = by_step.get(step, 0) + 1
-            total_progress += tracker.overall_progress
+        # 按步骤统计（计数随状态更新增量维护，无需遍历跟踪器）
+        by_step = {
+            step.value: count
+            for step, count in ProgressTracker._step_counts.items()
+            if count > 0
+        }
 
-        average_progress = total_progress / total_count
+        average_progress = ProgressTracker._progress_total / total_count
 
         return {
             "total_active": total_count,
@@ -8,13 +8,16 @@ from .file_utils import (
     get_file_info,
     cleanup_temp_files,
     generate_unique_filename,
-    ensure_directory
+    ensure_directory,
+    copy_upload_file
 )
 from .audio_utils import (
     get_audio_duration,
     convert_to_wav,
-    check_audio_format
+    check_audio_format,
+    probe_many
 )
+from .response_utils import ModelJSONResponse
 
 __all__ = [
     "validate_audio_file",
@@ -22,7 +25,10 @@ __all__ = [
     "cleanup_temp_files",
     "generate_unique_filename",
     "ensure_directory",
+    "copy_upload_file",
     "get_audio_duration",
     "convert_to_wav",
-    "check_audio_format"
+    "check_audio_format",
+    "probe_many",
+    "ModelJSONResponse"
 ]
\ No newline at end of file
@@ -2,15 +2,209 @@
 音频处理工具函数
 """
 
+import os
+import json
+import asyncio
 import subprocess
 import tempfile
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 import structlog
 
+try:
+    # PyAV直接调用libavformat读取文件头，无需启动ffprobe进程
+    import av
+except ImportError:
+    av = None
+
+try:
+    # libsndfile只需读取文件头即可得到WAV/FLAC等格式的时长
+    import soundfile as sf
+except ImportError:
+    sf = None
+
 logger = structlog.get_logger()
 
+# ffprobe探测超时（只读取文件头，通常远小于1秒）与ffmpeg转换超时，单位秒
+PROBE_TIMEOUT = float(os.getenv("PROBE_TIMEOUT", "3"))
+CONVERT_TIMEOUT = float(os.getenv("CONVERT_TIMEOUT", "300"))
+
+# 读取文件头时的探测上限：编码、采样率、声道数位于文件开头几KB内，无需扫描默认的5MB/5秒
+PROBE_OPTIONS = {'analyzeduration': '1M', 'probesize': '256K'}
+PROBE_BASE = ['ffprobe', '-v', 'error', '-analyzeduration', '1M', '-probesize', '256K']
+
+# 是否将探测结果写入音频文件旁的 .probe.json 文件，服务重启后仍可复用
+CACHE_PROBE = os.getenv("CACHE_PROBE", "0") == "1"
+
+# 可由soundfile直接读取时长的文件扩展名（mp3/m4a等交由PyAV/ffprobe处理）
+SOUNDFILE_SUFFIXES = frozenset({'.wav', '.flac', '.ogg', '.aiff'})
+
+def _probe_av(path_str: str) -> Optional[Dict[str, Any]]:
+    """
+    使用PyAV读取音频文件信息（阻塞调用）
+
+    Args:
+        path_str: 音频文件路径
+
+    Returns:
+        Optional[Dict[str, Any]]: 音频信息，PyAV不可用或无法解析时返回None
+    """
+    if av is None:
+        return None
+
+    try:
+        with av.open(path_str, options=PROBE_OPTIONS) as container:
+            if not container.streams.audio:
+                return None
+
+            stream = container.streams.audio[0]
+            codec_context = stream.codec_context
+
+            stream_duration = None
+            if stream.duration is not None and stream.time_base is not None:
+                stream_duration = float(stream.duration * stream.time_base)
+
+            return {
+                "duration": float(container.duration) / av.time_base if container.duration else None,
+                "format_name": container.format.name,
+                "codec_name": codec_context.name,
+                "sample_rate": codec_context.sample_rate or 0,
+                "channels": codec_context.channels or 0,
+                "stream_duration": stream_duration,
+                "bit_rate": container.bit_rate or None
+            }
+    except Exception as e:
+        logger.debug("PyAV读取音频信息失败，回退到ffprobe", error=str(e), file_path=path_str)
+        return None
+
+def _to_float(value: Optional[str]) -> Optional[float]:
+    """将ffprobe输出的数值字符串转换为浮点数（N/A等无效值返回None）"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_int(value: Optional[str]) -> Optional[int]:
+    """将ffprobe输出的数值字符串转换为整数（N/A等无效值返回None）"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _probe_ffprobe(path_str: str) -> Optional[Dict[str, Any]]:
+    """
+    使用一次ffprobe调用读取音频文件信息（阻塞调用）
+
+    Args:
+        path_str: 音频文件路径
+
+    Returns:
+        Optional[Dict[str, Any]]: 音频信息，无法读取或没有音频流时返回None
+    """
+    # compact格式每个段落输出一行 "段落名|键=值|键=值"，无需JSON解析
+    cmd = PROBE_BASE + [
+        '-select_streams', 'a:0',
+        '-show_entries', 'stream=codec_name,sample_rate,channels,duration',
+        '-show_entries', 'format=format_name,duration,bit_rate',
+        '-of', 'compact=nk=0:s=|',
+        path_str
+    ]
+
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        timeout=PROBE_TIMEOUT
+    )
+
+    if result.returncode != 0:
+        return None
+
+    sections = {}
+    for line in result.stdout.splitlines():
+        section, _, fields = line.partition('|')
+        sections[section] = dict(part.split('=', 1) for part in fields.split('|') if '=' in part)
+
+    stream = sections.get('stream')
+    if stream is None:
+        return None
+
+    format_info = sections.get('format', {})
+
+    return {
+        "duration": _to_float(format_info.get('duration')),
+        "format_name": format_info.get('format_name'),
+        "codec_name": stream.get('codec_name'),
+        "sample_rate": _to_int(stream.get('sample_rate')) or 0,
+        "channels": _to_int(stream.get('channels')) or 0,
+        "stream_duration": _to_float(stream.get('duration')),
+        "bit_rate": _to_int(format_info.get('bit_rate'))
+    }
+
+def _sidecar_path(path_str: str) -> str:
+    """探测结果缓存文件路径"""
+    return path_str + ".probe.json"
+
+def _load_sidecar(path_str: str, size: int, mtime_ns: int) -> Optional[Dict[str, Any]]:
+    """读取探测结果缓存文件，文件大小或修改时间不匹配时返回None"""
+    try:
+        with open(_sidecar_path(path_str), "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if data.get("size") != size or data.get("mtime_ns") != mtime_ns:
+        return None
+    return data.get("probe")
+
+def _save_sidecar(path_str: str, size: int, mtime_ns: int, probe: Dict[str, Any]):
+    """原子写入探测结果缓存文件（写入失败时忽略）"""
+    sidecar = _sidecar_path(path_str)
+    tmp_path = f"{sidecar}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"size": size, "mtime_ns": mtime_ns, "probe": probe}, f)
+        os.replace(tmp_path, sidecar)
+    except OSError as e:
+        logger.debug("写入探测缓存文件失败", error=str(e), file_path=path_str)
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+@lru_cache(maxsize=1024)
+def _probe_cached(path_str: str, size: int, mtime_ns: int) -> Optional[MappingProxyType]:
+    """
+    缓存的音频探测结果
+
+    优先使用PyAV读取，失败时回退到单次ffprobe调用。
+    以 (路径, 文件大小, 修改时间) 为键，文件被覆盖或修改后自动失效；
+    同一文件在校验、保存、分析各阶段的重复探测直接命中缓存；
+    启用CACHE_PROBE时还会读写 .probe.json 缓存文件
+    """
+    probe = _load_sidecar(path_str, size, mtime_ns) if CACHE_PROBE else None
+    if probe is None:
+        probe = _probe_av(path_str) or _probe_ffprobe(path_str)
+        if CACHE_PROBE and probe is not None:
+            _save_sidecar(path_str, size, mtime_ns, probe)
+    return MappingProxyType(probe) if probe is not None else None
+
+def _probe(file_path: Path) -> Optional[MappingProxyType]:
+    """探测音频文件信息（阻塞调用，结果按文件状态缓存）"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return _probe_cached(str(file_path), st.st_size, st.st_mtime_ns)
+
+async def _probe_async(file_path: Path) -> Optional[MappingProxyType]:
+    """在线程池中执行音频探测，避免阻塞事件循环"""
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, _probe, file_path)
+
 async def get_audio_duration(file_path: Path) -> Optional[float]:
     """
     获取音频文件时长（秒）
@@ -22,26 +216,19 @@ async def get_audio_duration(file_path: Path) -> Optional[float]:
         Optional[float]: 时长（秒），失败返回None
     """
     try:
-        # 使用ffprobe获取音频信息
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'default=noprint_wrappers=1:nokey=1',
-            str(file_path)
-        ]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        if result.returncode == 0:
-            duration_str = result.stdout.strip()
-            if duration_str:
-                return float(duration_str)
+        # WAV/FLAC等格式直接从文件头读取时长
+        if sf is not None and file_path.suffix.lower() in SOUNDFILE_SUFFIXES:
+            loop = asyncio.get_event_loop()
+            try:
+                info = await loop.run_in_executor(None, sf.info, str(file_path))
+                if info.duration:
+                    return float(info.duration)
+            except Exception as e:
+                logger.debug("soundfile读取时长失败，回退到完整探测", error=str(e), file_path=str(file_path))
+
+        probe = await _probe_async(file_path)
+        if probe is not None and probe["duration"]:
+            return probe["duration"]
 
         logger.warning("无法获取音频时长", file_path=str(file_path))
         return None
@@ -75,14 +262,22 @@ async def convert_to_wav(input_path: Path, output_path: Path) -> bool:
             str(output_path)
         ]
 
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=300  # 5分钟超时
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
         )
 
-        if result.returncode == 0 and output_path.exists():
+        try:
+            _, stderr = await asyncio.wait_for(process.communicate(), timeout=CONVERT_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            logger.error("音频格式转换超时", input=str(input_path))
+            return False
+
+        # -y 且返回码为0时输出文件必然已写入，无需再stat确认
+        if process.returncode == 0:
             logger.info("音频格式转换成功",
                        input=str(input_path),
                        output=str(output_path))
@@ -91,12 +286,9 @@ async def convert_to_wav(input_path: Path, output_path: Path) -> bool:
             logger.error("音频格式转换失败",
                         input=str(input_path),
                         output=str(output_path),
-                        stderr=result.stderr)
+                        stderr=stderr.decode("utf-8", errors="replace"))
             return False
 
-    except subprocess.TimeoutExpired:
-        logger.error("音频格式转换超时", input=str(input_path))
-        return False
     except Exception as e:
         logger.error("音频格式转换异常", error=str(e), input=str(input_path))
         return False
@@ -112,54 +304,29 @@ async def check_audio_format(file_path: Path) -> Tuple[str, bool]:
         Tuple[str, bool]: (格式描述, 是否有效)
     """
     try:
-        # 使用ffprobe检查文件
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'stream=codec_name,sample_rate,channels,duration',
-            '-show_entries', 'format=format_name,duration',
-            '-of', 'default=noprint_wrappers=1',
-            str(file_path)
-        ]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        if result.returncode != 0:
+        probe = await _probe_async(file_path)
+        if probe is None:
             return "无法读取的音频文件", False
 
-        # 解析输出信息
-        output_lines = result.stdout.strip().split('\n')
-        codec_info = {}
-
-        for line in output_lines:
-            if '=' in line:
-                key, value = line.split('=', 1)
-                codec_info[key.strip()] = value.strip()
-
         # 检查关键信息
-        codec_name = codec_info.get('codec_name', 'unknown')
-        sample_rate = codec_info.get('sample_rate', '0')
-        channels = codec_info.get('channels', '0')
-        duration = codec_info.get('duration', '0')
+        codec_name = probe["codec_name"] or 'unknown'
+        sample_rate = probe["sample_rate"]
+        channels = probe["channels"]
+        duration = probe["duration"]
 
         if codec_name == 'unknown':
             return "未知的音频编码", False
 
-        if sample_rate == '0':
+        if not sample_rate:
             return "无效的采样率", False
 
-        if channels == '0':
+        if not channels:
             return "无效的声道数", False
 
         # 格式化描述
         format_desc = f"音频格式: {codec_name}, 采样率: {sample_rate}Hz, 声道: {channels}"
-        if duration != '0':
-            format_desc += f", 时长: {float(duration):.1f}秒"
+        if duration:
+            format_desc += f", 时长: {duration:.1f}秒"
 
         return format_desc, True
 
@@ -179,10 +346,15 @@ def get_audio_file_info(file_path: Path) -> dict:
     Returns:
         dict: 音频文件信息
     """
+    try:
+        size_bytes = file_path.stat().st_size
+    except OSError:
+        size_bytes = None
+
     info = {
         "path": str(file_path),
-        "size_bytes": file_path.stat().st_size,
-        "exists": file_path.exists(),
+        "size_bytes": size_bytes,
+        "exists": size_bytes is not None,
         "duration": None,
         "format": "unknown",
         "sample_rate": None,
@@ -191,55 +363,44 @@ def get_audio_file_info(file_path: Path) -> dict:
         "valid": False
     }
 
-    if not file_path.exists():
+    if size_bytes is None:
         return info
 
     try:
-        # 使用ffprobe获取详细信息
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'stream=codec_name,sample_rate,channels,duration,bit_rate',
-            '-show_entries', 'format=format_name,size,duration,bit_rate',
-            '-of', 'json',
-            str(file_path)
-        ]
-
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        if result.returncode == 0:
-            import json
-            data = json.loads(result.stdout)
-
-            # 提取音频流信息
-            streams = data.get('streams', [])
-            audio_stream = None
-
-            for stream in streams:
-                if stream.get('codec_type') == 'audio':
-                    audio_stream = stream
-                    break
-
-            if audio_stream:
-                info.update({
-                    "format": audio_stream.get('codec_name', 'unknown'),
-                    "sample_rate": int(audio_stream.get('sample_rate', 0)),
-                    "channels": int(audio_stream.get('channels', 0)),
-                    "duration": float(audio_stream.get('duration', 0)),
-                    "valid": True
-                })
-
-                # 从format中获取比特率
-                format_info = data.get('format', {})
-                if format_info.get('bit_rate'):
-                    info["bitrate"] = int(format_info.get('bit_rate', 0))
+        probe = _probe(file_path)
+        if probe is not None:
+            info.update({
+                "format": probe["codec_name"] or "unknown",
+                "sample_rate": probe["sample_rate"],
+                "channels": probe["channels"],
+                "duration": probe["duration"] or probe["stream_duration"] or 0.0,
+                "bitrate": probe["bit_rate"],
+                "valid": True
+            })
 
     except Exception as e:
         logger.error("获取音频文件信息失败", error=str(e), file_path=str(file_path))
 
-    return info
\ No newline at end of file
+    return info
+
+async def probe_many(paths: Sequence[Path], max_workers: Optional[int] = None) -> List[dict]:
+    """
+    批量获取多个音频文件的详细信息
+
+    各文件的探测在线程池中并行执行，已探测过的文件直接命中缓存
+
+    Args:
+        paths: 音频文件路径列表
+        max_workers: 同时探测的文件数，默认为CPU核数
+
+    Returns:
+        List[dict]: 与输入顺序对应的音频文件信息（格式同get_audio_file_info）
+    """
+    loop = asyncio.get_event_loop()
+    semaphore = asyncio.Semaphore(max_workers or os.cpu_count() or 1)
+
+    async def _probe_one(file_path: Path) -> dict:
+        async with semaphore:
+            return await loop.run_in_executor(None, get_audio_file_info, file_path)
+
+    return list(await asyncio.gather(*(_probe_one(file_path) for file_path in paths)))
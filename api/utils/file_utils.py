@@ -2,14 +2,22 @@
 文件处理工具函数
 """
 
+import io
 import os
-import uuid
+import secrets
+import shutil
+import tempfile
 import aiofiles
 import time
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import BinaryIO, Tuple, Optional
 import structlog
 
+try:
+    from starlette.formparsers import MultiPartParser
+except ImportError:
+    MultiPartParser = None
+
 logger = structlog.get_logger()
 
 # 移除了API层的文件大小和音频时长限制，让核心库决定处理能力
@@ -24,6 +32,20 @@ SUPPORTED_FORMATS = {
     "audio/x-mpeg-3": "mp3"
 }
 
+# 支持格式的集合及错误提示中的格式列表（导入时预先构建）
+_SUPPORTED_MIMES = frozenset(SUPPORTED_FORMATS)
+_SUPPORTED_MIMES_TEXT = ", ".join(SUPPORTED_FORMATS)
+
+# 保存上传文件时每次读取的块大小（1MB）
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Starlette接收上传时SpooledTemporaryFile的内存上限，超过后内容才写入磁盘
+UPLOAD_SPOOL_MAX_SIZE = getattr(MultiPartParser, "max_file_size", 1024 * 1024)
+
+def normalize_content_type(content_type: Optional[str]) -> str:
+    """去除MIME类型中的参数并统一为小写"""
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
 async def validate_audio_file(file) -> Tuple[bool, Optional[str]]:
     """
     验证上传的音频文件
@@ -35,10 +57,10 @@ async def validate_audio_file(file) -> Tuple[bool, Optional[str]]:
         Tuple[bool, Optional[str]]: (是否有效, 错误信息)
     """
     try:
-        # 检查文件格式
-        content_type = file.content_type or ""
-        if content_type not in SUPPORTED_FORMATS:
-            return False, f"不支持的文件格式: {content_type}。支持的格式: {', '.join(SUPPORTED_FORMATS.keys())}"
+        # 检查文件格式（忽略参数及大小写，如 "audio/MPEG; charset=binary"）
+        content_type = normalize_content_type(file.content_type)
+        if content_type not in _SUPPORTED_MIMES:
+            return False, f"不支持的文件格式: {file.content_type or ''}。支持的格式: {_SUPPORTED_MIMES_TEXT}"
 
         # 检查文件是否为空
         content = await file.read(1)  # 只读取1字节来检查是否为空
@@ -65,18 +87,24 @@ async def get_file_info(file) -> dict:
         dict: 文件信息
     """
     try:
-        # 读取文件内容以获取大小
-        content = await file.read()
-        file_size = len(content)
-        # 重置文件指针
-        await file.seek(0)
+        # Starlette在接收上传时已记录文件大小，缺失时分块计数（不保留内容）
+        file_size = getattr(file, "size", None)
+        if file_size is None:
+            file_size = 0
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                file_size += len(chunk)
+            # 重置文件指针
+            await file.seek(0)
 
         return {
             "filename": file.filename,
             "content_type": file.content_type,
             "size_bytes": file_size,
             "size_mb": round(file_size / (1024 * 1024), 2),
-            "extension": SUPPORTED_FORMATS.get(file.content_type, "unknown")
+            "extension": SUPPORTED_FORMATS.get(normalize_content_type(file.content_type), "unknown")
         }
     except Exception as e:
         logger.error("获取文件信息失败", error=str(e), filename=file.filename)
@@ -104,7 +132,7 @@ def generate_unique_filename(original_name: str) -> str:
         ext = ""
 
     # 生成唯一ID
-    unique_id = str(uuid.uuid4())[:8]
+    unique_id = secrets.token_urlsafe(9)
     timestamp = int(time.time())
 
     # 组合文件名
@@ -125,14 +153,68 @@ async def save_upload_file(upload_file, destination: Path) -> bool:
         bool: 是否成功
     """
     try:
+        # 分块写入，内存占用与文件大小无关
         async with aiofiles.open(destination, 'wb') as f:
-            content = await upload_file.read()
-            await f.write(content)
+            while True:
+                chunk = await upload_file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await f.write(chunk)
         return True
     except Exception as e:
         logger.error("保存文件失败", error=str(e), destination=str(destination))
         return False
 
+def copy_upload_file(source: BinaryIO, destination: Path, size: Optional[int] = None) -> int:
+    """
+    将上传文件内容复制到目标路径（阻塞调用，应在线程池中执行）
+
+    UploadFile.file已落盘时使用os.sendfile在内核中完成复制，
+    仍在内存中或平台不支持时回退到分块复制
+
+    Args:
+        source: UploadFile.file（SpooledTemporaryFile）
+        destination: 目标路径
+        size: 上传文件大小（UploadFile.size），用于判断是否已落盘
+
+    Returns:
+        int: 写入的字节数
+    """
+    source.seek(0)
+
+    with open(destination, "wb") as f:
+        if hasattr(os, "sendfile") and _is_backed_by_disk(source, size):
+            try:
+                src_fd = source.fileno()
+                size = os.fstat(src_fd).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(f.fileno(), src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return offset
+            except (OSError, io.UnsupportedOperation):
+                # 例如macOS的sendfile只支持socket作为目标
+                f.seek(0)
+                f.truncate()
+                source.seek(0)
+
+        shutil.copyfileobj(source, f, UPLOAD_CHUNK_SIZE)
+        return f.tell()
+
+def _is_backed_by_disk(source: BinaryIO, size: Optional[int]) -> bool:
+    """
+    判断文件对象是否已有可用于sendfile的磁盘文件描述符
+
+    对SpooledTemporaryFile调用fileno()会强制把内存中的内容落盘，
+    因此按上传大小是否超过Starlette的内存上限来判断；
+    大小未知时按未落盘处理，走分块复制
+    """
+    if isinstance(source, tempfile.SpooledTemporaryFile):
+        return size is not None and size > UPLOAD_SPOOL_MAX_SIZE
+    return callable(getattr(source, "fileno", None))
+
 def cleanup_temp_files(temp_dir: Path, max_age_hours: int = 24):
     """
     清理临时文件
@@ -145,19 +227,21 @@ def cleanup_temp_files(temp_dir: Path, max_age_hours: int = 24):
         current_time = time.time()
         max_age_seconds = max_age_hours * 3600
 
-        if not temp_dir.exists():
-            return
-
+        # scandir的目录项自带文件类型并缓存stat结果，每个文件只需一次stat
         cleaned_count = 0
-        for file_path in temp_dir.iterdir():
-            if file_path.is_file():
-                file_age = current_time - file_path.stat().st_mtime
+        with os.scandir(temp_dir) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                file_age = current_time - entry.stat(follow_symlinks=False).st_mtime
                 if file_age > max_age_seconds:
-                    file_path.unlink()
+                    os.unlink(entry.path)
                     cleaned_count += 1
 
         logger.info("临时文件清理完成", cleaned_count=cleaned_count, temp_dir=str(temp_dir))
 
+    except FileNotFoundError:
+        return
     except Exception as e:
         logger.error("清理临时文件失败", error=str(e), temp_dir=str(temp_dir))
 
@@ -4,22 +4,48 @@
 """
 
 import os
+import time
+import asyncio
 import tempfile
 import uuid
+import secrets
 from pathlib import Path
-from typing import Tuple, Optional, BinaryIO, AsyncGenerator
+from typing import Dict, Tuple, Optional, BinaryIO, AsyncGenerator
 import structlog
-import aiofiles
-import aiofiles.os
 from fastapi import HTTPException
 
+from .file_utils import copy_upload_file
+from .audio_utils import CACHE_PROBE
+
 logger = structlog.get_logger()
 
+def _remove_temp_file(file_path: Path):
+    """删除临时文件（及启用CACHE_PROBE时生成的探测缓存文件）"""
+    paths = (file_path, Path(f"{file_path}.probe.json")) if CACHE_PROBE else (file_path,)
+    for path in paths:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
 class MemoryFileHandler:
     """内存文件处理器"""
 
     def __init__(self):
-        self.temp_files = {}  # 跟踪临时文件
+        # 所有临时文件直接存放在同一目录下，只在启动时创建一次
+        self.root = Path(tempfile.gettempdir()) / "music_analysis"
+        self.root.mkdir(parents=True, exist_ok=True)
+        # 跟踪临时文件（按字段分列存储，均以文件ID为键）
+        self.paths: Dict[str, Path] = {}
+        self.created_at: Dict[str, float] = {}
+        # 保护跟踪记录的锁（在事件循环中首次使用时创建）
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        """获取跟踪记录锁"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
 
     async def save_to_temp(self, upload_file) -> Tuple[Path, str]:
         """
@@ -32,40 +58,38 @@ class MemoryFileHandler:
             Tuple[Path, str]: (临时文件路径, 文件ID)
         """
         try:
-            # 生成唯一的文件ID和临时路径
-            file_id = str(uuid.uuid4())
-            temp_dir = Path(tempfile.gettempdir()) / "music_analysis" / file_id
-            temp_dir.mkdir(parents=True, exist_ok=True)
+            # 生成唯一的文件ID
+            file_id = uuid.uuid4().hex
 
-            # 使用原始文件名加上安全的时间戳
+            # 使用原始文件名加上随机后缀（随机后缀保证同一目录下不会重名）
             original_name = upload_file.filename or "audio"
+            suffix = secrets.token_urlsafe(9)
             if "." in original_name:
                 stem = original_name.rsplit(".", 1)[0]
                 ext = original_name.rsplit(".", 1)[1]
-                safe_filename = f"{stem}_{file_id[:8]}.{ext}"
+                safe_filename = f"{stem}_{suffix}.{ext}"
             else:
-                safe_filename = f"{original_name}_{file_id[:8]}"
+                safe_filename = f"{original_name}_{suffix}"
 
-            temp_file_path = temp_dir / safe_filename
+            temp_file_path = self.root / safe_filename
 
-            # 保存文件到临时目录
-            async with aiofiles.open(temp_file_path, 'wb') as f:
-                content = await upload_file.read()
-                await f.write(content)
+            # 在线程中一次性完成复制，避免每个分块都在事件循环与线程池之间往返
+            loop = asyncio.get_event_loop()
+            size = await loop.run_in_executor(
+                None, copy_upload_file, upload_file.file, temp_file_path, upload_file.size
+            )
 
             # 记录文件信息用于后续清理
-            self.temp_files[file_id] = {
-                "path": temp_file_path,
-                "dir": temp_dir,
-                "created_at": os.times()[4]  # 进程时间
-            }
+            async with self._get_lock():
+                self.paths[file_id] = temp_file_path
+                self.created_at[file_id] = time.monotonic()
 
             logger.info(
                 "文件保存到临时目录",
                 file_id=file_id,
                 original_name=original_name,
                 temp_path=str(temp_file_path),
-                size=len(content)
+                size=size
             )
 
             # 重置文件指针
@@ -87,28 +111,19 @@ class MemoryFileHandler:
         Returns:
             bool: 是否成功清理
         """
-        try:
-            if file_id not in self.temp_files:
-                logger.warning("文件ID不存在，跳过清理", file_id=file_id)
-                return False
-
-            file_info = self.temp_files[file_id]
-            temp_dir = file_info["dir"]
-            temp_file_path = file_info["path"]
+        # 先从跟踪记录中移除，避免并发清理同一文件
+        async with self._get_lock():
+            temp_file_path = self.paths.pop(file_id, None)
+            self.created_at.pop(file_id, None)
 
-            # 删除临时文件
-            if temp_file_path.exists():
-                await aiofiles.os.remove(temp_file_path)
-                logger.info("临时文件已删除", file_id=file_id, path=str(temp_file_path))
-
-            # 删除临时目录
-            if temp_dir.exists():
-                await aiofiles.os.rmdir(temp_dir)
-                logger.info("临时目录已删除", file_id=file_id, dir=str(temp_dir))
-
-            # 从跟踪记录中移除
-            del self.temp_files[file_id]
+        if temp_file_path is None:
+            logger.warning("文件ID不存在，跳过清理", file_id=file_id)
+            return False
 
+        try:
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, _remove_temp_file, temp_file_path)
+            logger.info("临时文件已删除", file_id=file_id, path=str(temp_file_path))
             return True
 
         except Exception as e:
@@ -117,23 +132,28 @@ class MemoryFileHandler:
 
     async def cleanup_all(self) -> int:
         """清理所有临时文件"""
-        cleaned_count = 0
-        file_ids = list(self.temp_files.keys())  # 复制键列表避免修改字典时迭代
+        async with self._get_lock():
+            temp_file_paths = list(self.paths.values())
+            self.paths.clear()
+            self.created_at.clear()
 
-        for file_id in file_ids:
-            if await self.cleanup_file(file_id):
-                cleaned_count += 1
+        # 各文件的删除在线程池中并行执行
+        loop = asyncio.get_event_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(None, _remove_temp_file, temp_file_path)
+            for temp_file_path in temp_file_paths
+        ))
 
-        logger.info("批量清理完成", cleaned_count=cleaned_count, total=len(file_ids))
-        return cleaned_count
+        logger.info("批量清理完成", cleaned_count=len(temp_file_paths), total=len(temp_file_paths))
+        return len(temp_file_paths)
 
     async def get_file_size(self, file_id: str) -> Optional[int]:
         """获取文件大小"""
-        if file_id not in self.temp_files:
+        file_path = self.paths.get(file_id)
+        if file_path is None:
             return None
 
         try:
-            file_path = self.temp_files[file_id]["path"]
             if file_path.exists():
                 return file_path.stat().st_size
         except Exception as e:
@@ -143,15 +163,15 @@ class MemoryFileHandler:
 
     def get_file_count(self) -> int:
         """获取当前存储的文件数量"""
-        return len(self.temp_files)
+        return len(self.paths)
 
     def get_total_size(self) -> int:
         """获取所有临时文件的总大小"""
         total_size = 0
-        for file_info in self.temp_files.values():
+        for file_path in self.paths.values():
             try:
-                if file_info["path"].exists():
-                    total_size += file_info["path"].stat().st_size
+                if file_path.exists():
+                    total_size += file_path.stat().st_size
             except Exception:
                 continue
 
@@ -167,13 +187,11 @@ async def cleanup_expired_files(max_age_minutes: int = 30):
     Args:
         max_age_minutes: 最大保存时间（分钟）
     """
-    import time
-
-    current_time = os.times()[4]
+    current_time = time.monotonic()
     expired_files = []
 
-    for file_id, file_info in memory_file_handler.temp_files.items():
-        age_minutes = (current_time - file_info["created_at"]) / 60
+    for file_id, created_at in memory_file_handler.created_at.items():
+        age_minutes = (current_time - created_at) / 60
         if age_minutes > max_age_minutes:
             expired_files.append(file_id)
 
@@ -0,0 +1,42 @@
+"""
+响应序列化工具函数
+"""
+
+from typing import Any, FrozenSet, Type
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from ..models import (
+    AnalysisResponse,
+    AsyncAnalysisResult,
+    TaskStatus,
+    BatchStatusResponse,
+    BatchResultResponse,
+    get_response_adapter
+)
+
+# 热点响应类型使用缓存的序列化器（首次响应时构建）
+_ADAPTED_RESPONSE_TYPES: FrozenSet[Type[BaseModel]] = frozenset({
+    AnalysisResponse,
+    AsyncAnalysisResult,
+    TaskStatus,
+    BatchStatusResponse,
+    BatchResultResponse,
+})
+
+
+class ModelJSONResponse(JSONResponse):
+    """
+    直接由pydantic-core序列化响应模型的JSON响应
+
+    跳过FastAPI的jsonable_encoder + json.dumps流程，并省略值为None的字段
+    """
+
+    def render(self, content: Any) -> bytes:
+        content_type = type(content)
+        if content_type in _ADAPTED_RESPONSE_TYPES:
+            return get_response_adapter(content_type).dump_json(content, exclude_none=True)
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(exclude_none=True).encode("utf-8")
+        return super().render(content)